@@ -0,0 +1,196 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from scipy.optimize import minimize
+
+import validation
+
+NANOSECONDS_PER_DAY = 86400 * 10**9
+
+# Jumlah worker process pool fit Omori-Utsu (1 = fit serial di proses pemanggil)
+MAX_WORKERS = os.cpu_count() or 1
+
+# Jumlah minimum gempa susulan agar parameter Omori-Utsu bisa diestimasi
+MIN_AFTERSHOCKS = 10
+
+# Batas pencarian (log10 c, p); fit yang berhenti di batas dianggap gagal
+FIT_BOUNDS = [(-5.0, 1.0), (0.2, 3.0)]
+BOUND_TOLERANCE = 1e-3
+
+# Status hasil fit per sekuens
+STATUS_OK = 'ok'
+STATUS_TOO_FEW = 'susulan kurang'
+STATUS_FAILED = 'fit gagal'
+
+
+# Jendela ruang-waktu Gardner-Knopoff (1974) untuk gempa susulan
+def gardner_knopoff_window(magnitude):
+    radius_km = 10 ** (0.1238 * magnitude + 0.983)
+    days = np.where(magnitude >= 6.5, 10 ** (0.032 * magnitude + 2.7389), 10 ** (0.5409 * magnitude - 0.547))
+    return radius_km, days
+
+
+# Integral laju Omori-Utsu (t + c)^-p dari 0 sampai T
+def _omori_integral(c, p, T):
+    if abs(1 - p) < 1e-6:
+        return np.log((T + c) / c)
+    return ((T + c) ** (1 - p) - c ** (1 - p)) / (1 - p)
+
+
+# Negatif log-likelihood Ogata (1983) dengan K diprofilkan: K = N / integral
+def _negative_log_likelihood(params, t, T):
+    c, p = 10 ** params[0], params[1]
+    n = len(t)
+    integral = _omori_integral(c, p, T)
+    if not np.isfinite(integral) or integral <= 0:
+        return np.inf
+    return -(n * np.log(n / integral) - p * np.log(t + c).sum() - n)
+
+
+def _failed_fit(status):
+    return {'K': np.nan, 'c': np.nan, 'p': np.nan, 'log_likelihood': np.nan, 'status': status}
+
+
+# Estimasi maksimum likelihood (K, c, p) untuk waktu gempa susulan t (hari
+# setelah gempa utama) yang diamati pada selang (0, T]. Optimasi yang tidak
+# konvergen atau berhenti di batas pencarian (mis. sekuens mirip Poisson)
+# dianggap gagal dan menghasilkan NaN.
+def fit_omori(t, T):
+    t = np.asarray(t, dtype=float)
+    if len(t) < MIN_AFTERSHOCKS:
+        return _failed_fit(STATUS_TOO_FEW)
+
+    result = minimize(_negative_log_likelihood, x0=[-1.5, 1.1], args=(t, T), method='L-BFGS-B',
+                      bounds=FIT_BOUNDS)
+    at_bound = any(abs(value - low) < BOUND_TOLERANCE or abs(value - high) < BOUND_TOLERANCE
+                   for value, (low, high) in zip(result.x, FIT_BOUNDS))
+    if not result.success or not np.isfinite(result.fun) or at_bound:
+        return _failed_fit(STATUS_FAILED)
+    c, p = 10 ** result.x[0], result.x[1]
+    return {'K': len(t) / _omori_integral(c, p, T), 'c': c, 'p': p, 'log_likelihood': -result.fun,
+            'status': STATUS_OK}
+
+
+def _fit_sequence(sequence):
+    t, T = sequence
+    return fit_omori(t, T)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Satu process pool untuk seluruh proses, dibuat saat pertama dipakai.
+# Pemanggilnya (server Streamlit, ThreadingHTTPServer) multi-thread, jadi
+# worker dibuat lewat forkserver (atau spawn) alih-alih fork.
+def _process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS,
+                                        mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+# Fit semua sekuens secara paralel dengan process pool bersama (MAX_WORKERS worker)
+def fit_sequences(sequences):
+    if not sequences:
+        return []
+    if MAX_WORKERS <= 1 or len(sequences) == 1:
+        return [_fit_sequence(sequence) for sequence in sequences]
+    pool = _process_pool()
+    try:
+        return list(pool.map(_fit_sequence, sequences, chunksize=max(1, len(sequences) // (4 * MAX_WORKERS))))
+    except BrokenProcessPool:
+        # Worker mati (mis. kehabisan memori): pool baru dibuat pada panggilan berikutnya
+        _discard_pool(pool)
+        raise
+
+
+# Durasi (hari) sampai laju Omori-Utsu turun ke laju latar belakang
+def activity_duration(K, c, p, background_rate):
+    if not np.isfinite(K) or not np.isfinite(background_rate) or background_rate <= 0:
+        return np.nan
+    return max((K / background_rate) ** (1 / p) - c, 0.0)
+
+
+# Ekstrak sekuens gempa susulan untuk setiap gempa utama M >= min_magnitude.
+#
+# Gempa yang berada di jendela gempa lain yang lebih besar dan lebih awal
+# dianggap gempa susulan, bukan gempa utama. Laju latar belakang dihitung dari
+# kejadian di radius yang sama selama jendela waktu sebelum gempa utama
+# (dipotong di awal katalog).
+def extract_sequences(data, min_magnitude=6.0):
+    data = data.dropna(subset=['datetime', 'latitude', 'longitude', 'magnitude']).sort_values('datetime', kind='stable')
+    times = data['datetime'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    lat = data['latitude'].to_numpy(dtype=float)
+    lon = data['longitude'].to_numpy(dtype=float)
+    magnitude = data['magnitude'].to_numpy(dtype=float)
+
+    candidates = np.flatnonzero(magnitude >= min_magnitude)
+    candidates = candidates[np.argsort(-magnitude[candidates], kind='stable')]
+    radius_km, days = gardner_knopoff_window(magnitude[candidates])
+
+    # Gempa utama yang sudah diterima, disimpan sebagai array agar setiap
+    # kandidat diuji terhadap semuanya sekaligus
+    accepted = np.zeros(len(candidates), dtype=bool)
+    window_end = times[candidates] + (days * NANOSECONDS_PER_DAY).astype(np.int64)
+    for k, index in enumerate(candidates):
+        # Lewati jika termasuk sekuens gempa utama yang lebih besar
+        m = np.flatnonzero(accepted[:k])
+        m = m[(times[candidates[m]] <= times[index]) & (times[index] <= window_end[m])]
+        if m.size and (validation.haversine_km(lat[candidates[m]], lon[candidates[m]], lat[index], lon[index])
+                       <= radius_km[m]).any():
+            continue
+        accepted[k] = True
+    mainshocks = sorted(zip(candidates[accepted], radius_km[accepted], days[accepted]))
+
+    sequences, background, results = [], [], []
+    for index, radius, window_days in mainshocks:
+        window = int(window_days * NANOSECONDS_PER_DAY)
+        start, end = np.searchsorted(times, [times[index] - window, times[index] + window], side='right')
+        nearby = validation.haversine_km(lat[index], lon[index], lat[start:end], lon[start:end]) <= radius
+        offset = np.arange(start, end)
+
+        after = nearby & (offset > index)
+        before = nearby & (offset < index) & (times[start:end] < times[index])
+        t = (times[start:end][after] - times[index]) / NANOSECONDS_PER_DAY
+        t = t[t > 0]
+        # Selang pengamatan terpotong di akhir katalog untuk gempa utama terbaru
+        observed_days = min(float(window_days), (times[-1] - times[index]) / NANOSECONDS_PER_DAY)
+        sequences.append((t, observed_days))
+        # Jendela latar belakang terpotong di awal katalog untuk gempa utama paling awal
+        background_days = min(float(window_days), (times[index] - times[0]) / NANOSECONDS_PER_DAY)
+        background.append(before.sum() / background_days if background_days > 0 else np.nan)
+        results.append(index)
+
+    return data.iloc[results], sequences, np.asarray(background, dtype=float)
+
+
+# Tabel parameter Omori-Utsu per gempa utama
+def fit_mainshocks(data, min_magnitude=6.0):
+    mainshocks, sequences, background = extract_sequences(data, min_magnitude)
+    fits = fit_sequences(sequences)
+
+    result = mainshocks[['datetime', 'location', 'latitude', 'longitude', 'depth', 'magnitude']].reset_index(drop=True)
+    result['jumlah_susulan'] = [len(t) for t, _ in sequences]
+    result['jendela_hari'] = [T for _, T in sequences]
+    for key in ['K', 'c', 'p', 'log_likelihood', 'status']:
+        result[key] = [fit[key] for fit in fits]
+    result['laju_latar_per_hari'] = background
+    result['durasi_hari'] = [activity_duration(fit['K'], fit['c'], fit['p'], rate)
+                             for fit, rate in zip(fits, background)]
+    return result, sequences
@@ -0,0 +1,166 @@
+import functools
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+import catalogs
+import regions
+import validation
+
+# Path default katalog gempa
+DATA_PATH = 'katalog_gempa2.csv'
+
+# Definisi wilayah lebih rinci berdasarkan pulau utama dengan cakupan penuh tanpa jeda.
+# Dipakai sebagai batas pengganti jika file GeoJSON wilayah tidak tersedia.
+regions_detailed = {
+    'Sumatera': {'lat_min': -6.5, 'lat_max': 6.5, 'lon_min': 94.5, 'lon_max': 106.5},
+    'Jawa': {'lat_min': -9.5, 'lat_max': -4.5, 'lon_min': 105.5, 'lon_max': 115.5},
+    'Kalimantan': {'lat_min': -4.5, 'lat_max': 3.5, 'lon_min': 108.5, 'lon_max': 119.5},
+    'Sulawesi': {'lat_min': -5.5, 'lat_max': 2.5, 'lon_min': 118.5, 'lon_max': 125.5},
+    'Papua': {'lat_min': -11.5, 'lat_max': 0.5, 'lon_min': 130.5, 'lon_max': 141.5},
+    'Bali dan Nusa Tenggara': {'lat_min': -10.5, 'lat_max': -7.5, 'lon_min': 114.5, 'lon_max': 119.5},
+    'Maluku': {'lat_min': -8.5, 'lat_max': 2.5, 'lon_min': 125.5, 'lon_max': 135.5}
+}
+
+# Kategori magnitudo dan kedalaman (urutan sesuai tampilan chart)
+KATEGORI_MAGNITUDO = ['Minor', 'Ringan', 'Sedang', 'Kuat', 'Besar']
+KATEGORI_KEDALAMAN = ['Dangkal', 'Menengah', 'Dalam']
+
+
+def _file_key(file_path):
+    if not os.path.exists(file_path):
+        return ''
+    stat = os.stat(file_path)
+    return f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+
+# Grid wilayah (poligon GeoJSON atau batas persegi), dibangun sekali per versi file
+@functools.lru_cache(maxsize=2)
+def _region_grid(file_key):
+    return regions.load_region_grid(regions_detailed)
+
+
+def region_grid():
+    return _region_grid(_file_key(regions.REGIONS_GEOJSON))
+
+
+# Daftar pulau untuk pilihan wilayah
+def island_names():
+    return region_grid().island_names
+
+
+# Batas koordinat suatu pulau (untuk posisi peta)
+def region_bounds(region):
+    return region_grid().bounds(region)
+
+
+# Versi dataset: berubah setiap kali file katalog diganti atau diperbarui.
+# Hanya membaca metadata file sehingga murah dipanggil di setiap request/rerun.
+# file_path bisa berupa satu path atau dict {sumber: path} (mode multi-katalog).
+def dataset_version(file_path=DATA_PATH):
+    paths = file_path.items() if isinstance(file_path, dict) else [('', file_path)]
+    key = '|'.join(f"{source}={_file_key(path)}" for source, path in paths)
+    key += '|' + _file_key(regions.REGIONS_GEOJSON)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+# Load dataset: validasi, hapus duplikat, parsing waktu dan label wilayah satu kali.
+# Dengan with_report=True juga mengembalikan laporan kualitas data.
+# Jika file_path berupa dict {sumber: path}, semua katalog digabung (catalogs.py).
+def load_data(file_path=DATA_PATH, with_report=False):
+    if isinstance(file_path, dict):
+        data, report = catalogs.load_merged(file_path)
+    else:
+        data = pd.read_csv(file_path, sep=';', low_memory=False)
+        data, report = validation.validate_catalog(data)
+    data['Year'] = data['datetime'].dt.year.astype('Int64')
+    regions.assign_regions(data, region_grid())
+    if with_report:
+        return data, report
+    return data
+
+
+# Fungsi untuk memfilter data berdasarkan rentang tahun
+def filter_data_by_year_range(data, start_year, end_year):
+    if 'Year' not in data.columns:
+        data['Year'] = pd.to_datetime(data['datetime'], errors='coerce').dt.year.astype('Int64')
+    return data[(data['Year'] >= start_year) & (data['Year'] <= end_year)]
+
+
+# Fungsi untuk memfilter data berdasarkan rentang tanggal (inklusif, presisi harian)
+def filter_data_by_date_range(data, start_date, end_date):
+    days = data['datetime'].dt.normalize()
+    return data[(days >= pd.Timestamp(start_date)) & (days <= pd.Timestamp(end_date))]
+
+
+# Fungsi untuk memfilter data berdasarkan pulau hasil point-in-polygon
+def filter_data_by_region(data, region):
+    if 'pulau' not in data.columns:
+        data = regions.assign_regions(data.copy(), region_grid())
+    return data[data['pulau'] == region]
+
+
+# Tahun pertama dan terakhir di dataset
+def year_bounds(data):
+    return int(data['Year'].min()), int(data['Year'].max())
+
+
+# Total gempa dan rata-rata jumlah gempa per hari
+def summary_statistics(data):
+    gempa_per_hari = data['datetime'].dt.date.value_counts()
+    return {
+        'total_gempa': int(len(data)),
+        'rata_rata_per_hari': float(gempa_per_hari.mean()) if not gempa_per_hari.empty else 0.0,
+    }
+
+
+# N gempa terkuat di dataset
+def strongest_events(data, n=10):
+    return data.nlargest(n, 'magnitude').reset_index(drop=True)
+
+
+# Jumlah kejadian gempa per tahun
+def yearly_counts(data):
+    return data.groupby('Year').size()
+
+
+# Rata-rata suatu kolom (magnitude/depth) per tahun
+def yearly_mean(data, column):
+    return data.groupby('Year')[column].mean()
+
+
+# Fungsi untuk mengkategorikan gempa berdasarkan magnitudo
+def magnitude_categories(data):
+    kategori = pd.cut(data['magnitude'], bins=[-np.inf, 4.0, 5.0, 6.0, 7.0, np.inf],
+                      labels=KATEGORI_MAGNITUDO, right=False)
+    return kategori.value_counts().reindex(KATEGORI_MAGNITUDO, fill_value=0)
+
+
+# Jumlah gempa per pulau (setiap kejadian hanya masuk ke satu pulau)
+def region_counts(data):
+    if 'pulau' not in data.columns:
+        data = regions.assign_regions(data.copy(), region_grid())
+    counts = data['pulau'].value_counts().reindex(island_names(), fill_value=0)
+    return {island: int(count) for island, count in counts.items()}
+
+
+# Histogram kedalaman gempa (frekuensi dan tepi bin)
+def depth_histogram(data, bins=30):
+    depth = data['depth'].dropna().to_numpy()
+    if depth.size == 0:
+        return np.zeros(bins, dtype=int), np.zeros(bins + 1)
+    return np.histogram(depth, bins=bins)
+
+
+# Kategorisasi kedalaman
+def depth_categories(data):
+    kategori = pd.cut(data['depth'], bins=[0, 70, 300, float('inf')], labels=KATEGORI_KEDALAMAN)
+    return kategori.value_counts().sort_index()
+
+
+# Distribusi jam kejadian gempa
+def hourly_counts(data):
+    hour = data['datetime'].dt.hour.dropna().astype(int)
+    return hour.value_counts().reindex(range(24), fill_value=0)
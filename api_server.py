@@ -0,0 +1,319 @@
+import argparse
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import aftershock
+import analytics
+import precompute
+import topk
+
+# Jumlah maksimum hasil endpoint berparameter yang disimpan per versi dataset
+RESULT_CACHE_SIZE = 256
+
+
+# Konversi hasil agregasi pandas menjadi struktur yang bisa di-serialize ke JSON
+def series_to_dict(series):
+    return {str(key): _json_value(value) for key, value in series.items()}
+
+
+# Nilai skalar ke tipe JSON; NaN, NaT dan tak hingga menjadi null
+def _json_value(value):
+    if isinstance(value, (list, tuple, dict)):
+        return value
+    if value is None or value != value:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+# Bersihkan seluruh payload secara rekursif sebelum di-serialize
+def _json_clean(payload):
+    if isinstance(payload, dict):
+        return {str(key): _json_clean(value) for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [_json_clean(value) for value in payload]
+    return _json_value(payload)
+
+
+def frame_to_records(frame):
+    return [{key: _json_value(value) for key, value in row.items()} for row in frame.to_dict('records')]
+
+
+def events_to_records(events):
+    return frame_to_records(events[['datetime', 'location', 'latitude', 'longitude', 'depth', 'magnitude']])
+
+
+# Dataset yang dimuat beserta indeks top-k (satu per versi dataset)
+Dataset = namedtuple('Dataset', ['data', 'report', 'topk'])
+
+
+def _load_dataset(file_path):
+    data, report = analytics.load_data(file_path, with_report=True)
+    return Dataset(data, report, topk.TopKIndex(data))
+
+
+# Cache dataset dan hasil agregasi di dalam proses, dikunci dengan versi dataset.
+#
+# Dataset, indeks dan hasil endpoint tanpa parameter dibangun di background
+# (precompute) saat server mulai dan setiap kali versi dataset berubah; fit
+# gempa susulan (process pool) dihitung saat diminta. Permintaan selalu dilayani dari snapshot lengkap terakhir
+# (stale-while-revalidate); hasil dengan parameter di-cache per versi snapshot
+# (LRU, maksimum RESULT_CACHE_SIZE). Lock hanya menjaga dict hasil: perhitungan
+# berjalan di luar lock, dan permintaan kunci yang sama menunggu Future yang
+# sedang dihitung alih-alih menghitung ulang.
+class AnalyticsCache:
+    def __init__(self, file_path=analytics.DATA_PATH, poll_seconds=precompute.POLL_SECONDS):
+        self.file_path = file_path
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.precomputer = precompute.Precomputer(self.current_version, [
+            {'dataset': lambda version, a: _load_dataset(file_path)},
+            {endpoint: (lambda version, a, compute=compute: compute(a['dataset']))
+             for endpoint, compute in ENDPOINTS.items() if endpoint not in ON_DEMAND},
+        ], poll_seconds)
+
+    def start(self):
+        self.precomputer.start()
+        return self
+
+    def current_version(self):
+        return analytics.dataset_version(self.file_path)
+
+    # Versi dataset yang sedang disajikan (bisa tertinggal saat precompute berjalan)
+    def served_version(self):
+        self.precomputer.poke()
+        return self.precomputer.snapshot().version
+
+    def quality_report(self):
+        snapshot = self.precomputer.snapshot()
+        return snapshot.version, snapshot['dataset'].report
+
+    def get(self, endpoint, params, compute):
+        snapshot = self.precomputer.snapshot()
+        if not params and endpoint in snapshot:
+            return snapshot.version, snapshot[endpoint]
+        key = (snapshot.version, endpoint, tuple(sorted(params.items())))
+        with self.lock:
+            future = self.results.get(key)
+            owner = future is None
+            if owner:
+                for stale in [k for k in self.results if k[0] != snapshot.version]:
+                    del self.results[stale]
+                future = self.results[key] = Future()
+                while len(self.results) > RESULT_CACHE_SIZE:
+                    self.results.popitem(last=False)
+            else:
+                self.results.move_to_end(key)
+        if owner:
+            try:
+                future.set_result(compute(snapshot['dataset'], **params))
+            except Exception as exc:
+                future.set_exception(exc)
+                with self.lock:
+                    if self.results.get(key) is future:
+                        del self.results[key]
+        return snapshot.version, future.result()
+
+
+# Parsing parameter query (start/end tahun, region, n) menjadi argumen endpoint
+def _year_params(query):
+    params = {}
+    if 'start' in query:
+        params['start_year'] = int(query['start'][0])
+    if 'end' in query:
+        params['end_year'] = int(query['end'][0])
+    if 'region' in query:
+        region = query['region'][0]
+        if region not in analytics.island_names():
+            raise ValueError(f"Wilayah tidak dikenal: {region}")
+        params['region'] = region
+    return params
+
+
+def _subset(data, start_year=None, end_year=None, region=None):
+    if region is not None:
+        data = analytics.filter_data_by_region(data, region)
+    if start_year is not None or end_year is not None:
+        lo, hi = analytics.year_bounds(data) if not data.empty else (0, 0)
+        data = analytics.filter_data_by_year_range(data, start_year if start_year is not None else lo,
+                                                   end_year if end_year is not None else hi)
+    return data
+
+
+def compute_summary(dataset, **params):
+    return analytics.summary_statistics(_subset(dataset.data, **params))
+
+
+def compute_yearly(dataset, **params):
+    subset = _subset(dataset.data, **params)
+    return {
+        'jumlah': series_to_dict(analytics.yearly_counts(subset)),
+        'rata_rata_magnitudo': series_to_dict(analytics.yearly_mean(subset, 'magnitude')),
+        'rata_rata_kedalaman': series_to_dict(analytics.yearly_mean(subset, 'depth')),
+    }
+
+
+def compute_regions(dataset, **params):
+    return analytics.region_counts(_subset(dataset.data, **params))
+
+
+# Batas jumlah kejadian per permintaan /api/strongest
+MAX_STRONGEST = 1000
+
+
+# Gempa terkuat dijawab dari indeks top-k; hanya n besar yang memindai data
+def compute_strongest(dataset, n=10, start_year=None, end_year=None, region=None):
+    if n <= dataset.topk.k:
+        regions = [region] if region is not None else None
+        return events_to_records(dataset.topk.query(n, regions, start_year, end_year))
+    subset = _subset(dataset.data, start_year=start_year, end_year=end_year, region=region)
+    return events_to_records(analytics.strongest_events(subset, n))
+
+
+def compute_depth(dataset, **params):
+    subset = _subset(dataset.data, **params)
+    counts, edges = analytics.depth_histogram(subset)
+    return {
+        'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()},
+        'kategori': series_to_dict(analytics.depth_categories(subset)),
+    }
+
+
+def compute_magnitude(dataset, **params):
+    return series_to_dict(analytics.magnitude_categories(_subset(dataset.data, **params)))
+
+
+# Parameter Omori-Utsu per gempa utama (fit paralel, di-cache per versi dataset)
+def compute_aftershocks(dataset, min_magnitude=6.0, **params):
+    fits, _ = aftershock.fit_mainshocks(_subset(dataset.data, **params), min_magnitude)
+    return frame_to_records(fits)
+
+
+ENDPOINTS = {
+    '/api/summary': compute_summary,
+    '/api/yearly': compute_yearly,
+    '/api/regions': compute_regions,
+    '/api/strongest': compute_strongest,
+    '/api/depth': compute_depth,
+    '/api/magnitude': compute_magnitude,
+    '/api/aftershocks': compute_aftershocks,
+}
+
+# Endpoint yang tidak dihitung oleh precompute
+ON_DEMAND = {'/api/aftershocks'}
+
+
+def _etag(version, path, params):
+    return '"' + hashlib.sha1(f"{version}|{path}|{sorted(params.items())}".encode('utf-8')).hexdigest() + '"'
+
+
+class AnalyticsHandler(BaseHTTPRequestHandler):
+    cache = None
+
+    # Error tak terduga (perhitungan, cache) dikembalikan sebagai JSON 500
+    # alih-alih memutus koneksi klien
+    def do_GET(self):
+        try:
+            self._handle_get()
+        except ConnectionError:
+            raise
+        except Exception as exc:
+            self.log_error('Gagal memproses %s: %r', self.path, exc)
+            self._send_json({'error': 'Kesalahan internal server'}, status=500)
+
+    def _handle_get(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == '/api/version':
+            version, refreshing = self.cache.served_version(), self.cache.precomputer.refreshing
+            etag = _etag(version, url.path, {'memperbarui': refreshing})
+            if not self._not_modified(etag):
+                self._send_json({'version': version, 'memperbarui': refreshing}, etag=etag)
+            return
+        if url.path == '/api/quality':
+            if not self._not_modified(_etag(self.cache.served_version(), url.path, {})):
+                version, report = self.cache.quality_report()
+                self._send_json({'version': version, 'data': report}, etag=_etag(version, url.path, {}))
+            return
+        if url.path not in ENDPOINTS:
+            self._send_json({'error': 'Endpoint tidak ditemukan'}, status=404)
+            return
+
+        try:
+            params = _year_params(query)
+            if url.path == '/api/strongest' and 'n' in query:
+                params['n'] = int(query['n'][0])
+                if not 1 <= params['n'] <= MAX_STRONGEST:
+                    raise ValueError(f"n harus antara 1 dan {MAX_STRONGEST}")
+            if url.path == '/api/aftershocks' and 'min_magnitude' in query:
+                params['min_magnitude'] = float(query['min_magnitude'][0])
+        except ValueError as exc:
+            self._send_json({'error': str(exc)}, status=400)
+            return
+
+        # ETag dihitung dari versi dataset yang disajikan dan parameter sehingga
+        # klien yang polling mendapat 304 tanpa memicu perhitungan ulang
+        if self._not_modified(_etag(self.cache.served_version(), url.path, params)):
+            return
+
+        version, result = self.cache.get(url.path, params, ENDPOINTS[url.path])
+        self._send_json({'version': version, 'data': result}, etag=_etag(version, url.path, params))
+
+    # Kirim 304 jika klien sudah memegang `etag`; True jika respons sudah dikirim
+    def _not_modified(self, etag):
+        if etag not in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            return False
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.end_headers()
+        return True
+
+    def _send_json(self, payload, status=200, etag=None):
+        body = json.dumps(_json_clean(payload), ensure_ascii=False, allow_nan=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(host='127.0.0.1', port=8502, file_path=analytics.DATA_PATH):
+    # Precompute dimulai bersama server sehingga permintaan pertama tidak memuat ulang dataset
+    handler = type('Handler', (AnalyticsHandler,), {'cache': AnalyticsCache(file_path).start()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='API JSON lokal untuk agregasi data gempa')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--data', default=analytics.DATA_PATH)
+    parser.add_argument('--catalog', action='append', default=[], metavar='SUMBER=PATH',
+                        help='Katalog tambahan untuk digabung dengan --data (bisa diulang)')
+    args = parser.parse_args()
+
+    file_path = args.data
+    if args.catalog:
+        file_path = {'BMKG': args.data}
+        for item in args.catalog:
+            source, _, path = item.partition('=')
+            file_path[source] = path
+
+    server = make_server(args.host, args.port, file_path)
+    print(f"API berjalan di http://{args.host}:{args.port}")
+    server.serve_forever()
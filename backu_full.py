@@ -2,24 +2,88 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import streamlit as st
-from folium.plugins import HeatMap
-from streamlit_folium import st_folium
 import folium
 from sklearn.cluster import KMeans
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
 import numpy as np
 
-# Fungsi untuk memfilter data berdasarkan rentang tahun
+import analytics
+import maps
+import precompute
+import risk
+
+# Fungsi untuk memfilter data berdasarkan rentang tahun (data bersama tidak diubah)
 def filter_data_by_year_range(data, start_year, end_year):
-    data['Year'] = pd.to_datetime(data['datetime'], errors='coerce').dt.year
-    filtered_data = data[(data['Year'] >= start_year) & (data['Year'] <= end_year)]
+    year = pd.to_datetime(data['datetime'], errors='coerce').dt.year
+    filtered_data = data[(year >= start_year) & (year <= end_year)].assign(Year=year)
     return filtered_data
 
-# Load dataset
+# Lokasi dataset (dimuat oleh precompute di background)
 file_path = 'katalog_gempa2.csv'  # Ganti dengan path file Anda
-data = pd.read_csv(file_path, sep=';', low_memory=False)
+
+# Nilai awal widget yang dihitung lebih dulu oleh precompute
+DEFAULT_CLUSTERS = 3
+DEFAULT_RESOLUTION = 0.25
+
+
+# Kolom yang dipakai clustering lokasi (tanpa NaN)
+def clustering_columns(data):
+    return data[['latitude', 'longitude', 'magnitude']].dropna()
+
+
+# Label K-Means untuk sejumlah cluster
+def cluster_labels(clustering_data, num_clusters):
+    kmeans = KMeans(n_clusters=num_clusters, random_state=42)
+    return kmeans.fit_predict(clustering_data)
+
+
+# Label K-Means untuk jumlah cluster selain nilai awal, di-cache per versi dataset
+@st.cache_data
+def load_clusters(version, _clustering_data, num_clusters):
+    return cluster_labels(_clustering_data, num_clusters)
+
+
+# Batas grid risiko: kotak derajat bulat yang mencakup semua kejadian
+def risk_bounds(data):
+    located = data[['latitude', 'longitude']].dropna()
+    return (float(np.floor(located['latitude'].min())), float(np.ceil(located['latitude'].max())),
+            float(np.floor(located['longitude'].min())), float(np.ceil(located['longitude'].max())))
+
+
+# Prediksi grid lat/lon/kedalaman untuk satu resolusi grid
+def risk_grid(model, lat_min, lat_max, lon_min, lon_max, resolution):
+    lats, lons = risk.grid_axes(lat_min, lat_max, lon_min, lon_max, resolution)
+    return lats, lons, risk.predict_risk_grid(model, lats, lons)
+
+
+# Grid risiko untuk resolusi selain nilai awal, di-cache per versi model
+@st.cache_data
+def load_risk_grid(version, _model, lat_min, lat_max, lon_min, lon_max, resolution):
+    return risk_grid(_model, lat_min, lat_max, lon_min, lon_max, resolution)
+
+
+# Model risiko, clustering dan grid risiko awal dibangun di background setiap
+# kali versi dataset berubah; sesi memakai snapshot terakhir sampai selesai.
+# Builder hanya memanggil fungsi biasa (fungsi st.cache_data butuh konteks sesi).
+@st.cache_resource
+def start_precompute(file_path):
+    return precompute.Precomputer(lambda: analytics.dataset_version(file_path), [
+        {'katalog': lambda version, a: pd.read_csv(file_path, sep=';', low_memory=False)},
+        {
+            'model_risiko': lambda version, a: risk.train_risk_model(a['katalog']),
+            'cluster': lambda version, a: cluster_labels(clustering_columns(a['katalog']), DEFAULT_CLUSTERS),
+        },
+        {'grid_risiko': lambda version, a: risk_grid(a['model_risiko'][0], *risk_bounds(a['katalog']),
+                                                     DEFAULT_RESOLUTION)},
+    ]).start()
+
+
+precomputer = start_precompute(file_path)
+precomputer.poke()
+snapshot = precomputer.snapshot()
+dataset_version = snapshot.version
+data = snapshot['katalog']
+if precomputer.refreshing:
+    st.sidebar.info('Dataset baru sedang diproses; menampilkan versi sebelumnya.')
 
 # Streamlit UI
 st.title('📊 **Visualisasi Data Gempa Indonesia**')
@@ -49,18 +113,7 @@ if page == "Beranda":
         
         # Peta lokasi gempa terkuat
         st.subheader("🗺️ Lokasi 10 Gempa Terkuat")
-        m = folium.Map(location=[gempa_terkuat['latitude'].mean(), gempa_terkuat['longitude'].mean()], zoom_start=5)
-        for _, row in gempa_terkuat.iterrows():
-            folium.Marker(
-                location=[row['latitude'], row['longitude']],
-                popup=(
-                    f"<b>Lokasi:</b> {row['location']}<br>"
-                    f"<b>Magnitudo:</b> {row['magnitude']}<br>"
-                    f"<b>Tahun:</b> {pd.to_datetime(row['datetime']).year}"
-                ),
-                icon=folium.Icon(color='red', icon='info-sign')
-            ).add_to(m)
-        st_folium(m, width=700, height=500)
+        maps.show_map(maps.cached_map_html('terkuat', (), dataset_version, lambda: maps.build_strongest_map(gempa_terkuat)))
     else:
         st.warning("Kolom 'magnitude', 'location', atau dataset kosong. Mohon periksa kembali dataset Anda.")
 
@@ -177,17 +230,14 @@ elif page == "Visualisasi Berdasarkan Tahun":
     # Membuat heatmap menggunakan Folium
     st.subheader(f"Heatmap Gempa Bumi ({start_year} - {end_year})")
 
-    # Inisialisasi peta
-    m = folium.Map(location=[-2.5, 118], zoom_start=5)
-
     # Menyiapkan data untuk heatmap
-    heat_data = [[row['latitude'], row['longitude']] for index, row in filtered_data.iterrows() if not pd.isnull(row['latitude']) and not pd.isnull(row['longitude'])]
+    points = filtered_data[['latitude', 'longitude']].dropna()
 
-    # Menambahkan heatmap ke peta
-    if heat_data:
-        HeatMap(heat_data, radius=10).add_to(m)
-        # Tampilkan peta di Streamlit
-        st_folium(m, width=700, height=500)
+    # Peta di-cache per filter dan ditampilkan sebagai komponen statis
+    if not points.empty:
+        html = maps.cached_map_html('heatmap_tahun', (start_year, end_year, min_mag, max_mag), dataset_version,
+                                    lambda: maps.build_heatmap(points, [-2.5, 118], 5, radius=10))
+        maps.show_map(html)
     else:
         st.warning("Tidak ada data gempa untuk rentang tahun yang dipilih.")
 
@@ -274,16 +324,13 @@ elif page == "Visualisasi Berdasarkan Pulau":
     # Filter data dengan menghapus baris yang memiliki NaN di latitude, longitude, atau magnitude
     filtered_island_data_cleaned = filtered_island_data.dropna(subset=['latitude', 'longitude', 'magnitude'])
     
-    # Menyiapkan peta
-    m = folium.Map(location=[(lat_min + lat_max) / 2, (lon_min + lon_max) / 2], zoom_start=6)
-    
-    # Menyiapkan data untuk heatmap
-    heat_data = [[row['latitude'], row['longitude'], row['magnitude']] for index, row in filtered_island_data_cleaned.iterrows()]
-    
-    # Menambahkan heatmap ke peta
-    if heat_data:
-        HeatMap(heat_data, radius=15).add_to(m)
-        st_folium(m, width=700, height=500)
+    # Menambahkan heatmap (berbobot magnitudo) ke peta
+    if not filtered_island_data_cleaned.empty:
+        html = maps.cached_map_html(
+            'heatmap_pulau', (selected_island, start_year, end_year, min_mag, max_mag), dataset_version,
+            lambda: maps.build_heatmap(filtered_island_data_cleaned, [(lat_min + lat_max) / 2, (lon_min + lon_max) / 2], 6,
+                                  radius=15, weight='magnitude'))
+        maps.show_map(html)
     else:
         st.warning(f"Tidak ada data gempa di Pulau {selected_island}.")
 
@@ -293,14 +340,16 @@ elif page == "Clustering Lokasi Gempa":
     st.subheader('📊 Clustering Lokasi Gempa')
 
     # Filter data dengan kolom yang relevan dan tanpa NaN
-    clustering_data = data[['latitude', 'longitude', 'magnitude']].dropna()
+    clustering_data = clustering_columns(data)
 
     # Pilih jumlah cluster
-    num_clusters = st.slider('Pilih Jumlah Cluster:', min_value=2, max_value=10, value=3)
+    num_clusters = st.slider('Pilih Jumlah Cluster:', min_value=2, max_value=10, value=DEFAULT_CLUSTERS)
 
-    # K-Means clustering
-    kmeans = KMeans(n_clusters=num_clusters, random_state=42)
-    clustering_data['cluster'] = kmeans.fit_predict(clustering_data)
+    # K-Means clustering (jumlah cluster awal sudah dihitung di background)
+    if num_clusters == DEFAULT_CLUSTERS:
+        clustering_data['cluster'] = snapshot['cluster']
+    else:
+        clustering_data['cluster'] = load_clusters(dataset_version, clustering_data, num_clusters)
 
     # Visualisasi hasil clustering pada scatter plot
     fig, ax = plt.subplots(figsize=(10, 6))
@@ -319,27 +368,13 @@ elif page == "Clustering Lokasi Gempa":
 elif page == "Prediksi Risiko Wilayah":
     st.subheader('📈 Prediksi Tingkat Risiko Wilayah')
 
-    # Menambahkan kolom risiko: High (1) jika magnitudo > 6, Low (0) jika magnitudo <= 6
-    data['risk'] = np.where(data['magnitude'] > 6, 1, 0)
-
-    # Fitur dan label
-    features = ['latitude', 'longitude', 'depth']
-    X = data[features].dropna()
-    y = data['risk'][X.index]
-
-    # Split data untuk training dan testing
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    # Random Forest Classifier
-    model = RandomForestClassifier(random_state=42, class_weight='balanced')
-    model.fit(X_train, y_train)
-
-    # Prediksi pada data testing
-    y_pred = model.predict(X_test)
+    # Model risiko: High (1) jika magnitudo > 6, Low (0) jika magnitudo <= 6
+    version = risk.model_version(dataset_version)
+    model, report, X_test, y_pred = snapshot['model_risiko']
 
     # Menampilkan hasil evaluasi model
     st.text('Hasil Evaluasi Model:')
-    st.text(classification_report(y_test, y_pred))
+    st.text(report)
 
     # Visualisasi prediksi pada data test
     st.subheader('Visualisasi Prediksi Risiko')
@@ -356,20 +391,27 @@ elif page == "Prediksi Risiko Wilayah":
     st.pyplot(fig)
 
     st.subheader('🗺️ Visualisasi Risiko Wilayah pada Peta')
-    m = folium.Map(location=[data['latitude'].mean(), data['longitude'].mean()], zoom_start=5)
-    
-    # Tambahkan marker berdasarkan risiko
-    for features, prediction in zip(X_test.itertuples(index=False), y_pred):
-        color = 'red' if prediction == 1 else 'green'
-        folium.CircleMarker(
-            location=[features.latitude, features.longitude],
-            radius=5,
-            color=color,
-            fill=True,
-            fill_color=color,
-            fill_opacity=0.7,
-            popup=f"Risk: {'High' if prediction == 1 else 'Low'}"
-        ).add_to(m)
-    
-    # Tampilkan peta di Streamlit
-    st_folium(m, width=700, height=500)
+    resolution = st.select_slider('Resolusi Grid (derajat):', options=[0.1, 0.25, 0.5, 1.0], value=DEFAULT_RESOLUTION)
+    depth_options = ['Maksimum semua kedalaman'] + [f'{depth} km' for depth in risk.GRID_DEPTHS]
+    selected_depth = st.selectbox('Kedalaman:', depth_options)
+
+    if resolution == DEFAULT_RESOLUTION:
+        lats, lons, probability = snapshot['grid_risiko']
+    else:
+        lats, lons, probability = load_risk_grid(version, model, *risk_bounds(data), resolution)
+    if selected_depth == depth_options[0]:
+        layer = probability.max(axis=0)
+    else:
+        layer = probability[depth_options.index(selected_depth) - 1]
+
+    # Seluruh grid ditampilkan sebagai satu lapisan gambar
+    def build_risk_map():
+        m = folium.Map(location=[data['latitude'].mean(), data['longitude'].mean()], zoom_start=5)
+        maps.add_raster_overlay(m, layer, lats, lons, name='Probabilitas Risiko Tinggi',
+                                cmap='coolwarm', vmin=0.0, vmax=1.0)
+        return m
+
+    st.caption('Warna menunjukkan probabilitas risiko tinggi (biru = rendah, merah = tinggi).')
+
+    # Tampilkan peta di Streamlit (HTML di-cache per versi model, resolusi dan kedalaman)
+    maps.show_map(maps.cached_map_html('risiko', (resolution, selected_depth), version, build_risk_map))
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+import validation
+
+# Nama kolom alternatif dari berbagai katalog (BMKG, USGS, ISC, dll.)
+COLUMN_ALIASES = {
+    'datetime': ['datetime', 'time', 'origin_time', 'origintime', 'date_time', 'waktu'],
+    'latitude': ['latitude', 'lat', 'lintang'],
+    'longitude': ['longitude', 'lon', 'long', 'lng', 'bujur'],
+    'depth': ['depth', 'depth_km', 'kedalaman'],
+    'magnitude': ['magnitude', 'mag', 'mw', 'magnitudo'],
+    'location': ['location', 'place', 'region', 'remark', 'lokasi', 'keterangan'],
+}
+# Kolom tanggal dan jam terpisah (mis. ekspor BMKG lama: tgl + ot)
+DATE_TIME_PAIRS = [('tgl', 'ot'), ('date', 'time'), ('tanggal', 'jam')]
+
+# Toleransi pencocokan kejadian antar lembaga (waktu asal dan lokasi berbeda sedikit)
+MERGE_SECONDS = 16.0
+MERGE_KM = 100.0
+
+
+# Baca katalog CSV; pemisah (';' atau ',') ditentukan dari baris header
+def read_catalog(path):
+    with open(path, encoding='utf-8', errors='replace') as f:
+        header = f.readline()
+    sep = ';' if header.count(';') > header.count(',') else ','
+    return pd.read_csv(path, sep=sep, low_memory=False)
+
+
+# Samakan skema katalog ke kolom standar aplikasi dan tambahkan kolom sumber
+def normalize_schema(data, source):
+    lower = {column.lower().strip(): column for column in data.columns}
+    normalized = pd.DataFrame(index=data.index)
+
+    for pair in DATE_TIME_PAIRS:
+        if 'datetime' not in lower and all(name in lower for name in pair):
+            # Digabung hanya jika tanggal dan jam ada; selain itu kosong (NaT
+            # setelah parsing), bukan string 'nan nan' yang terhitung waktu tidak valid
+            day, time = data[lower[pair[0]]], data[lower[pair[1]]]
+            normalized['datetime'] = (day.astype(str) + ' ' + time.astype(str)).where(day.notna() & time.notna())
+            break
+
+    for target, aliases in COLUMN_ALIASES.items():
+        if target in normalized.columns:
+            continue
+        column = next((lower[alias] for alias in aliases if alias in lower), None)
+        if column is not None:
+            normalized[target] = data[column]
+        elif target == 'location':
+            normalized[target] = ''
+
+    normalized['source'] = source
+    return normalized
+
+
+# Baca, normalisasi dan validasi satu katalog
+def load_catalog(path, source):
+    return validation.validate_catalog(normalize_schema(read_catalog(path), source))
+
+
+# Label grup satu-ke-satu dari pasangan lintas sumber.
+#
+# Pasangan diproses dari yang paling dekat (selisih waktu dan jarak, masing-
+# masing dinormalisasi dengan toleransinya). Dua grup hanya digabung jika
+# sumbernya tidak beririsan dan setiap anggotanya berpasangan langsung, sehingga
+# satu grup memuat paling banyak satu kejadian per sumber dan kejadian lain dari
+# sumber yang sama tetap menjadi grupnya sendiri.
+def match_labels(rank, times, lat, lon, left, right, max_seconds=MERGE_SECONDS, max_km=MERGE_KM):
+    times = np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+    seconds = np.abs(times[left] - times[right]) / 1e9
+    km = validation.haversine_km(np.asarray(lat)[left], np.asarray(lon)[left],
+                                 np.asarray(lat)[right], np.asarray(lon)[right])
+    pairs = set(zip(np.minimum(left, right).tolist(), np.maximum(left, right).tolist()))
+
+    labels = np.arange(len(rank))
+    members = {}
+    for k in np.argsort(seconds / max_seconds + km / max_km, kind='stable'):
+        a, b = labels[left[k]], labels[right[k]]
+        group_a, group_b = members.get(a, [a]), members.get(b, [b])
+        if a == b or {rank[i] for i in group_a} & {rank[i] for i in group_b}:
+            continue
+        if any((min(i, j), max(i, j)) not in pairs for i in group_a for j in group_b):
+            continue
+        members[a] = group_a + group_b
+        members.pop(b, None)
+        labels[group_b] = a
+    return labels
+
+
+# Gabungkan beberapa katalog menjadi satu daftar kejadian.
+#
+# Kejadian yang sama dari lembaga berbeda dicocokkan dengan jendela waktu
+# terurut + cek jarak (validation.match_events) lalu dipasangkan satu-ke-satu
+# (match_labels). Dari setiap grup dipilih
+# solusi dari sumber dengan prioritas tertinggi (urutan `catalogs`), lalu yang
+# paling awal. Kolom 'source' berisi sumber solusi terpilih dan 'sumber' berisi
+# semua sumber yang melaporkan kejadian tersebut.
+def merge_catalogs(catalogs, max_seconds=MERGE_SECONDS, max_km=MERGE_KM):
+    sources = [frame['source'].iloc[0] if len(frame) else None for frame in catalogs]
+    combined = pd.concat(catalogs, ignore_index=True)
+    rank = np.repeat(np.arange(len(catalogs)), [len(frame) for frame in catalogs])
+
+    left, right = validation.match_events(combined['datetime'].to_numpy(), combined['latitude'].to_numpy(),
+                                          combined['longitude'].to_numpy(), max_seconds, max_km)
+    # Hanya pasangan lintas sumber; duplikat dalam satu sumber sudah dibuang saat validasi
+    cross = rank[left] != rank[right]
+    labels = match_labels(rank, combined['datetime'].to_numpy(), combined['latitude'].to_numpy(),
+                          combined['longitude'].to_numpy(), left[cross], right[cross], max_seconds, max_km)
+
+    # Gabungan sumber per grup sebagai bitmask prioritas
+    masks = np.zeros(len(combined), dtype=np.int64)
+    np.bitwise_or.at(masks, labels, np.left_shift(1, rank))
+    mask_names = {mask: '+'.join(source for i, source in enumerate(sources) if mask >> i & 1)
+                  for mask in np.unique(masks[labels])}
+
+    order = np.lexsort((combined['datetime'].to_numpy(dtype='datetime64[ns]'), rank, labels))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = labels[order][1:] != labels[order][:-1]
+    preferred = order[first]
+
+    merged = combined.iloc[preferred].copy()
+    group_masks = masks[labels[preferred]]
+    merged['sumber'] = [mask_names[mask] for mask in group_masks]
+    merged['jumlah_sumber'] = [bin(mask).count('1') for mask in group_masks]
+    return merged.sort_values('datetime', kind='stable').reset_index(drop=True)
+
+
+# Muat semua katalog {sumber: path} dan gabungkan; laporan kualitas dijumlahkan
+def load_merged(paths, max_seconds=MERGE_SECONDS, max_km=MERGE_KM):
+    catalogs, reports = [], {}
+    for source, path in paths.items():
+        catalog, report = load_catalog(path, source)
+        catalogs.append(catalog)
+        reports[source] = report
+
+    merged = merge_catalogs(catalogs, max_seconds, max_km)
+    report = {
+        'total_baris': sum(r['total_baris'] for r in reports.values()),
+        'kolom_hilang': sorted({c for r in reports.values() for c in r['kolom_hilang']}),
+        'nilai_kosong': {c: sum(r['nilai_kosong'][c] for r in reports.values()) for c in validation.REQUIRED_COLUMNS},
+        'waktu_tidak_valid': sum(r['waktu_tidak_valid'] for r in reports.values()),
+        'di_luar_rentang': {c: sum(r['di_luar_rentang'][c] for r in reports.values()) for c in validation.VALID_RANGES},
+        'baris_tidak_valid': sum(r['baris_tidak_valid'] for r in reports.values()),
+        'duplikat_dihapus': sum(r['duplikat_dihapus'] for r in reports.values()),
+        'baris_bersih': sum(r['baris_bersih'] for r in reports.values()),
+        'kejadian_gabungan': int(len(merged)),
+        'kejadian_multi_sumber': int((merged['jumlah_sumber'] > 1).sum()),
+        'per_sumber': reports,
+    }
+    return merged, report
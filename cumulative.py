@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# Besaran yang dijumlahkan per hari untuk setiap wilayah
+QUANTITIES = ['jumlah', 'magnitudo', 'kedalaman', 'momen']
+
+
+# Momen seismik (N·m) dari magnitudo momen (Hanks & Kanamori, 1979)
+def seismic_moment(magnitude):
+    return 10 ** (1.5 * np.asarray(magnitude, dtype=float) + 9.1)
+
+
+# Magnitudo momen yang setara dengan momen seismik total
+def moment_magnitude(moment):
+    return (np.log10(moment) - 9.1) / 1.5
+
+
+def _to_day(value):
+    return pd.Timestamp(value).to_datetime64().astype('datetime64[D]')
+
+
+# Array kumulatif harian per pulau: jumlah kejadian, jumlah magnitudo,
+# jumlah kedalaman dan jumlah momen seismik.
+#
+# prefix[q][r, i] = total besaran q di wilayah r dari hari pertama sampai
+# sebelum hari ke-i, sehingga statistik rentang tanggal apa pun cukup dihitung
+# dari dua lookup: prefix[q][r, akhir + 1] - prefix[q][r, awal]. Baris terakhir
+# berisi seluruh katalog (termasuk kejadian di luar batas pulau).
+class DailyCumulative:
+    def __init__(self, data):
+        data = data.dropna(subset=['datetime', 'magnitude', 'depth'])
+        days = data['datetime'].to_numpy(dtype='datetime64[D]')
+        if len(days):
+            self.first_day, self.last_day = days.min(), days.max()
+        else:
+            self.first_day = self.last_day = np.datetime64('1970-01-01', 'D')
+        self.n_days = int((self.last_day - self.first_day).astype(np.int64)) + 1
+        offset = (days - self.first_day).astype(np.int64)
+
+        if 'pulau' in data.columns:
+            self.region_names = list(data['pulau'].cat.categories)
+            region = data['pulau'].cat.codes.to_numpy().astype(np.int64)
+        else:
+            self.region_names = []
+            region = np.full(len(data), -1, dtype=np.int64)
+        n_regions = len(self.region_names) + 1
+        assigned = region >= 0
+
+        magnitude = data['magnitude'].to_numpy(dtype=float)
+        weights = {
+            'jumlah': None,
+            'magnitudo': magnitude,
+            'kedalaman': data['depth'].to_numpy(dtype=float),
+            'momen': seismic_moment(magnitude),
+        }
+
+        self.prefix = {}
+        size = (n_regions - 1) * self.n_days
+        for name in QUANTITIES:
+            w = weights[name]
+            dtype = np.int64 if w is None else float
+            daily = np.zeros((n_regions, self.n_days), dtype=dtype)
+            daily[:-1] = np.bincount(region[assigned] * self.n_days + offset[assigned],
+                                     weights=None if w is None else w[assigned], minlength=size).reshape(-1, self.n_days)
+            daily[-1] = np.bincount(offset, weights=w, minlength=self.n_days)
+
+            prefix = np.zeros((n_regions, self.n_days + 1), dtype=dtype)
+            prefix[:, 1:] = daily.cumsum(axis=1)
+            self.prefix[name] = prefix
+
+    # Rentang tanggal yang dicakup katalog (datetime.date)
+    def date_bounds(self):
+        return pd.Timestamp(self.first_day).date(), pd.Timestamp(self.last_day).date()
+
+    def _row(self, region):
+        return -1 if region is None else self.region_names.index(region)
+
+    # Indeks prefix [awal, akhir) untuk rentang tanggal inklusif
+    def _span(self, start_date, end_date):
+        start = int((_to_day(start_date) - self.first_day).astype(np.int64))
+        end = int((_to_day(end_date) - self.first_day).astype(np.int64)) + 1
+        start, end = np.clip([start, end], 0, self.n_days)
+        return start, max(start, end)
+
+    # Jumlah, rata-rata dan momen total untuk rentang tanggal (inklusif)
+    def totals(self, start_date, end_date, region=None):
+        row = self._row(region)
+        start, end = self._span(start_date, end_date)
+        sums = {name: self.prefix[name][row, end] - self.prefix[name][row, start] for name in QUANTITIES}
+        count = int(sums['jumlah'])
+        return {
+            'jumlah': count,
+            'rata_rata_magnitudo': sums['magnitudo'] / count if count else np.nan,
+            'rata_rata_kedalaman': sums['kedalaman'] / count if count else np.nan,
+            'momen_total': float(sums['momen']),
+            'magnitudo_ekuivalen': moment_magnitude(sums['momen']) if count else np.nan,
+        }
+
+    # Jumlah kejadian per hari dalam rentang tanggal (selisih prefix berurutan)
+    def daily_counts(self, start_date, end_date, region=None):
+        start, end = self._span(start_date, end_date)
+        counts = np.diff(self.prefix['jumlah'][self._row(region), start:end + 1])
+        index = pd.date_range(pd.Timestamp(self.first_day + start), periods=len(counts), freq='D')
+        return pd.Series(counts, index=index)
@@ -0,0 +1,301 @@
+import argparse
+import contextlib
+import json
+import random
+import resource
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import streamlit
+from streamlit.runtime import Runtime
+from streamlit.testing.v1 import AppTest, app_test
+from streamlit.testing.v1.element_tree import Checkbox, Multiselect, Slider
+from streamlit.testing.v1.util import patch_config_options
+
+# Load test aplikasi Streamlit dengan N sesi bersamaan.
+#
+# Setiap sesi adalah AppTest headless di proses yang sama (seperti server
+# Streamlit: satu proses, satu thread per sesi, cache bersama). Sesi berpindah
+# halaman dan "menggeser" slider/selectbox secara acak, lalu latensi setiap
+# interaksi (satu rerun penuh) dicatat.
+#
+#   python loadtest.py --sessions 20 --interactions 30
+
+PERCENTILES = [50, 90, 95, 99]
+
+# Bobot jenis interaksi (pola pengguna): pindah halaman, geser slider, ganti pilihan
+ACTION_WEIGHTS = {'halaman': 0.25, 'slider': 0.45, 'pilihan': 0.2, 'centang': 0.1}
+
+
+# RSS proses saat ini (MB) dari /proc, atau puncak RSS jika /proc tidak ada
+def current_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# AppTest mengasumsikan satu tes pada satu waktu: setiap run memasang Runtime
+# tiruan global lalu menghapusnya. Agar banyak sesi bisa berjalan bersamaan
+# seperti di server, Runtime tiruan dari run pertama dipakai bersama oleh semua
+# sesi (termasuk media file manager dan storage cache) dan tidak pernah dihapus.
+class _SharedRuntimeMeta(type):
+    @property
+    def _instance(cls):
+        return Runtime._instance
+
+    @_instance.setter
+    def _instance(cls, value):
+        if value is not None and Runtime._instance is None:
+            Runtime._instance = value
+
+
+class _SharedRuntime(Runtime, metaclass=_SharedRuntimeMeta):
+    pass
+
+
+# concurrent_app_tests mengganti atribut internal streamlit.testing.v1.app_test
+# (bukan API publik). Periksa dulu bahwa atribut tersebut masih ada di versi
+# Streamlit yang terpasang, agar load test gagal jelas alih-alih diam-diam
+# menjalankan sesi satu per satu dengan Runtime terpisah.
+def _check_app_test_internals():
+    missing = [name for name in ('Runtime', 'patch_config_options') if not hasattr(app_test, name)]
+    if not missing and app_test.Runtime is not Runtime:
+        missing.append('Runtime (bukan streamlit.runtime.Runtime)')
+    if '_instance' not in vars(Runtime):
+        missing.append('Runtime._instance')
+    if missing:
+        raise RuntimeError(f"Streamlit {streamlit.__version__} tidak kompatibel dengan loadtest.py: "
+                           f"internal AppTest berubah ({', '.join(missing)}). Versi yang sudah diuji: 1.66.")
+
+
+@contextlib.contextmanager
+def concurrent_app_tests():
+    _check_app_test_internals()
+    original_runtime, original_patch = app_test.Runtime, app_test.patch_config_options
+    with patch_config_options({'global.appTest': True}):
+        app_test.Runtime = _SharedRuntime
+        app_test.patch_config_options = lambda options: contextlib.nullcontext()
+        try:
+            yield
+        finally:
+            app_test.Runtime, app_test.patch_config_options = original_runtime, original_patch
+            Runtime._instance = None
+
+
+class RssMonitor(threading.Thread):
+    def __init__(self, interval=0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.samples.append(current_rss_mb())
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+# Langkah slider terdekat ke target, satu langkah per rerun (meniru drag)
+def _drag_steps(slider, rng, max_steps):
+    low, high, step = slider.proto.min, slider.proto.max, slider.proto.step or 1
+    value = slider.value
+    if isinstance(value, (tuple, list)):
+        lower, upper = value
+        moving_upper = rng.random() < 0.5
+        current = upper if moving_upper else lower
+        bound_low, bound_high = (lower, high) if moving_upper else (low, upper)
+    else:
+        current, bound_low, bound_high = value, low, high
+    target = rng.uniform(bound_low, bound_high)
+    direction = step if target > current else -step
+    steps = []
+    for _ in range(rng.randint(1, max_steps)):
+        current = min(max(current + direction, bound_low), bound_high)
+        if isinstance(value, (tuple, list)):
+            steps.append((lower, current) if moving_upper else (current, upper))
+        else:
+            steps.append(current)
+    if isinstance(value, int) or (isinstance(value, (tuple, list)) and isinstance(value[0], int)):
+        steps = [tuple(int(v) for v in s) if isinstance(s, tuple) else int(s) for s in steps]
+    return steps
+
+
+class Session:
+    def __init__(self, app_path, session_id, seed, timeout):
+        self.app_path = app_path
+        self.id = session_id
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.latencies = defaultdict(list)
+        self.errors = []
+        self.at = None
+
+    def _run(self, action, element=None):
+        start = time.perf_counter()
+        if element is None:
+            self.at.run(timeout=self.timeout)
+        else:
+            element.run(timeout=self.timeout)
+        self.latencies[action].append(time.perf_counter() - start)
+        if self.at.exception:
+            self.errors.append(f"{action}: {self.at.exception[0].value}")
+
+    def start(self):
+        self.at = AppTest.from_file(self.app_path, default_timeout=self.timeout)
+        self._run('muat_awal')
+
+    # Satu interaksi acak berdasarkan widget yang ada di halaman saat ini
+    def interact(self, max_drag_steps=5):
+        main = self.at.main
+        available = {
+            'halaman': list(self.at.sidebar.selectbox),
+            'slider': list(main.slider) + list(main.select_slider),
+            'pilihan': list(main.selectbox) + list(main.multiselect),
+            'centang': list(main.checkbox),
+        }
+        actions = [action for action, widgets in available.items() if widgets]
+        action = self.rng.choices(actions, weights=[ACTION_WEIGHTS[a] for a in actions])[0]
+        widget = self.rng.choice(available[action])
+
+        if isinstance(widget, Slider):
+            for value in _drag_steps(widget, self.rng, max_drag_steps):
+                if isinstance(value, tuple):
+                    self._run(action, widget.set_range(*value))
+                else:
+                    self._run(action, widget.set_value(value))
+                widget = self._find_slider(widget)
+                if widget is None:
+                    break
+        elif isinstance(widget, Multiselect):
+            chosen = self.rng.sample(widget.options, self.rng.randint(0, min(3, len(widget.options))))
+            self._run(action, widget.set_value(chosen))
+        elif isinstance(widget, Checkbox):
+            self._run(action, widget.set_value(not widget.value))
+        else:
+            # Selectbox dan select_slider: pilih salah satu opsi
+            self._run(action, widget.set_value(self.rng.choice(widget.options)))
+
+    # Slider yang sama setelah rerun (elemen AppTest dibuat ulang tiap run)
+    def _find_slider(self, widget):
+        for candidate in self.at.main.slider:
+            if candidate.key == widget.key and candidate.label == widget.label:
+                return candidate
+        return None
+
+
+def run_session(session, interactions, think_time):
+    for _ in range(interactions):
+        if think_time > 0:
+            time.sleep(session.rng.expovariate(1 / think_time))
+        try:
+            session.interact()
+        except Exception as exc:  # interaksi gagal tetap dicatat, sesi lanjut
+            session.errors.append(repr(exc))
+    return session
+
+
+def summarize(latencies):
+    values = np.asarray(latencies) * 1000
+    summary = {'jumlah': int(values.size)}
+    if values.size:
+        summary.update({f'p{q}_ms': float(np.percentile(values, q)) for q in PERCENTILES})
+        summary['maks_ms'] = float(values.max())
+    return summary
+
+
+def load_test(app_path, sessions, interactions, think_time=0.5, seed=0, timeout=120):
+    monitor = RssMonitor()
+    monitor.start()
+    rss_start = current_rss_mb()
+
+    # Tahap 1: buka sesi berurutan untuk mengukur memori yang ditahan per sesi
+    tracemalloc.start()
+    opened, session_memory = [], []
+    for session_id in range(sessions):
+        before = tracemalloc.get_traced_memory()[0]
+        session = Session(app_path, session_id, seed + session_id, timeout)
+        session.start()
+        session_memory.append((tracemalloc.get_traced_memory()[0] - before) / 2**20)
+        opened.append(session)
+    tracemalloc.stop()
+    rss_opened = current_rss_mb()
+
+    # Tahap 2: semua sesi berinteraksi bersamaan
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        list(executor.map(lambda s: run_session(s, interactions, think_time), opened))
+    duration = time.perf_counter() - start
+    monitor.stop()
+
+    by_action = defaultdict(list)
+    for session in opened:
+        for action, values in session.latencies.items():
+            by_action[action].extend(values)
+    all_interactions = [v for action, values in by_action.items() if action != 'muat_awal' for v in values]
+
+    return {
+        'sesi': sessions,
+        'interaksi_per_sesi': interactions,
+        'durasi_detik': duration,
+        'latensi': {'semua': summarize(all_interactions),
+                    **{action: summarize(values) for action, values in sorted(by_action.items())}},
+        'memori_per_sesi_mb': {'rata_rata': float(np.mean(session_memory)), 'maks': float(np.max(session_memory)),
+                               'per_sesi': session_memory},
+        'rss_mb': {'awal': rss_start, 'setelah_sesi_dibuka': rss_opened, 'akhir': current_rss_mb(),
+                   'puncak': max(monitor.samples + [peak_rss_mb()])},
+        'error': [f"sesi {s.id}: {error}" for s in opened for error in s.errors],
+    }
+
+
+def print_report(result):
+    print(f"Sesi: {result['sesi']}, interaksi per sesi: {result['interaksi_per_sesi']}, "
+          f"durasi: {result['durasi_detik']:.1f} s")
+    print(f"{'interaksi':<12}{'jumlah':>8}" + ''.join(f"{f'p{q} (ms)':>12}" for q in PERCENTILES) + f"{'maks (ms)':>12}")
+    for action, summary in result['latensi'].items():
+        if not summary['jumlah']:
+            continue
+        print(f"{action:<12}{summary['jumlah']:>8}" + ''.join(f"{summary[f'p{q}_ms']:>12.0f}" for q in PERCENTILES)
+              + f"{summary['maks_ms']:>12.0f}")
+    memory = result['memori_per_sesi_mb']
+    print(f"Memori per sesi (tracemalloc): rata-rata {memory['rata_rata']:.1f} MB, maks {memory['maks']:.1f} MB")
+    rss = result['rss_mb']
+    print(f"RSS proses: awal {rss['awal']:.0f} MB, setelah sesi dibuka {rss['setelah_sesi_dibuka']:.0f} MB, "
+          f"akhir {rss['akhir']:.0f} MB, puncak {rss['puncak']:.0f} MB")
+    if result['error']:
+        print(f"{len(result['error'])} error, contoh: {result['error'][0]}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test sesi Streamlit bersamaan')
+    parser.add_argument('--app', default='streamlit_app.py')
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--interactions', type=int, default=20)
+    parser.add_argument('--think-time', type=float, default=0.5, help='Rata-rata jeda antar interaksi (detik)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--json', help='Simpan hasil lengkap ke file JSON')
+    args = parser.parse_args()
+
+    with concurrent_app_tests():
+        result = load_test(args.app, args.sessions, args.interactions, args.think_time, args.seed, args.timeout)
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,96 @@
+import re
+from bisect import bisect_left
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+TOKEN_PATTERN = re.compile(r'[^\W\d_]+')
+
+# Kata sambung yang tidak ditampilkan di halaman frekuensi kata
+STOPWORDS = frozenset({'of', 'the', 'and', 'near', 'off', 'dan', 'di', 'ke', 'dari', 'km'})
+
+
+# Pecah teks lokasi menjadi token huruf kecil (angka dan tanda baca dibuang)
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+# Indeks terbalik kolom lokasi, dibangun sekali saat load.
+#
+# Teks lokasi di-encode sebagai kamus: setiap string unik diberi id dan hanya
+# string unik yang di-tokenisasi. Posting list menyimpan id string per token
+# (terurut menurut token, lalu id string), sehingga token dengan awalan yang
+# sama bersebelahan dan pencarian awalan cukup dengan binary search. Frekuensi
+# token dihitung sekali dari jumlah kejadian per string.
+class LocationIndex:
+    def __init__(self, data, column='location'):
+        self.codes, strings = pd.factorize(data[column])
+        self.n_strings = len(strings)
+        string_counts = np.bincount(self.codes[self.codes >= 0], minlength=len(strings))
+
+        vocabulary, pair_string, pair_token, pair_count = {}, [], [], []
+        for string_id, text in enumerate(strings):
+            for token, count in Counter(tokenize(text)).items():
+                pair_string.append(string_id)
+                pair_token.append(vocabulary.setdefault(token, len(vocabulary)))
+                pair_count.append(count)
+
+        # Id token mengikuti urutan alfabet agar awalan membentuk rentang
+        self.tokens = sorted(vocabulary)
+        remap = np.empty(len(vocabulary), dtype=np.int64)
+        remap[[vocabulary[token] for token in self.tokens]] = np.arange(len(self.tokens))
+        pair_token = remap[np.asarray(pair_token, dtype=np.int64)]
+        pair_string = np.asarray(pair_string, dtype=np.int64)
+
+        order = np.lexsort((pair_string, pair_token))
+        self.postings = pair_string[order]
+        self.posting_offsets = np.zeros(len(self.tokens) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_token, minlength=len(self.tokens)), out=self.posting_offsets[1:])
+
+        # Frekuensi token di seluruh katalog: kemunculan per string x jumlah kejadian
+        frequency = np.bincount(pair_token, weights=np.asarray(pair_count) * string_counts[pair_string],
+                                minlength=len(self.tokens)).astype(np.int64)
+        self.token_counts = pd.Series(frequency, index=self.tokens).sort_values(ascending=False, kind='stable')
+
+    # Rentang id token yang sama dengan `word` (atau diawali `word` jika prefix=True)
+    def _token_range(self, word, prefix=False):
+        low = bisect_left(self.tokens, word)
+        if prefix:
+            return low, bisect_left(self.tokens, word + '\uffff')
+        return low, low + (low < len(self.tokens) and self.tokens[low] == word)
+
+    # Id string lokasi yang memuat semua kata kueri. Kata harus sama persis
+    # dengan token, kecuali kata terakhir yang sedang diketik (kueri tidak
+    # diakhiri spasi/tanda baca) yang dicocokkan sebagai awalan; prefix=False
+    # mematikan pencocokan awalan. None jika kueri tidak berisi kata.
+    def matching_strings(self, query, prefix=True):
+        matched = None
+        words = tokenize(query)
+        typing = prefix and str(query)[-1:].isalpha()
+        for position, word in enumerate(words):
+            low, high = self._token_range(word, typing and position == len(words) - 1)
+            ids = np.unique(self.postings[self.posting_offsets[low]:self.posting_offsets[high]])
+            matched = ids if matched is None else np.intersect1d(matched, ids, assume_unique=True)
+        return matched
+
+    # Mask boolean baris data yang cocok dengan kueri (kueri kosong = semua baris)
+    def mask(self, query, prefix=True):
+        matched = self.matching_strings(query, prefix)
+        if matched is None:
+            return np.ones(len(self.codes), dtype=bool)
+        # Kode -1 (lokasi kosong) jatuh ke elemen terakhir yang selalu False
+        string_mask = np.zeros(self.n_strings + 1, dtype=bool)
+        string_mask[matched] = True
+        return string_mask[self.codes]
+
+    # Posisi baris data yang cocok dengan kueri
+    def search(self, query, prefix=True):
+        return np.flatnonzero(self.mask(query, prefix))
+
+    # n token paling sering, tanpa kata sambung
+    def top_tokens(self, n=100, exclude_stopwords=True):
+        counts = self.token_counts
+        if exclude_stopwords:
+            counts = counts[~counts.index.isin(STOPWORDS)]
+        return counts.head(n)
@@ -0,0 +1,144 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import folium
+import numpy as np
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+from folium.plugins import HeatMap
+from matplotlib import colormaps
+from matplotlib.colors import Normalize
+
+
+# Ubah grid nilai (baris = lintang naik, kolom = bujur naik) menjadi gambar RGBA
+def grid_to_rgba(values, cmap='YlOrRd', vmin=None, vmax=None, min_alpha_value=None):
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    if vmin is None:
+        vmin = float(values[finite].min()) if finite.any() else 0.0
+    if vmax is None:
+        vmax = float(values[finite].max()) if finite.any() else 1.0
+    rgba = colormaps[cmap](Normalize(vmin=vmin, vmax=vmax if vmax > vmin else vmin + 1)(values))
+    # Sel kosong/di bawah ambang dibuat transparan
+    transparent = ~finite
+    if min_alpha_value is not None:
+        transparent |= values <= min_alpha_value
+    rgba[transparent, 3] = 0.0
+    return rgba
+
+
+# Tambahkan grid sebagai satu lapisan gambar di peta folium.
+# lats/lons adalah titik tengah sel grid.
+def add_raster_overlay(m, values, lats, lons, name, cmap='YlOrRd', opacity=0.6,
+                       vmin=None, vmax=None, min_alpha_value=None):
+    half_lat = (lats[1] - lats[0]) / 2 if len(lats) > 1 else 0.5
+    half_lon = (lons[1] - lons[0]) / 2 if len(lons) > 1 else 0.5
+    bounds = [[float(lats[0] - half_lat), float(lons[0] - half_lon)],
+              [float(lats[-1] + half_lat), float(lons[-1] + half_lon)]]
+    rgba = grid_to_rgba(values, cmap, vmin, vmax, min_alpha_value)
+    folium.raster_layers.ImageOverlay(
+        image=rgba,
+        bounds=bounds,
+        origin='lower',
+        opacity=opacity,
+        name=name,
+        mercator_project=True,
+    ).add_to(m)
+    return m
+
+
+# Heatmap titik gempa, opsional berbobot kolom `weight`
+def build_heatmap(points, location, zoom_start, radius=15, weight=None):
+    m = folium.Map(location=location, zoom_start=zoom_start)
+    columns = ['latitude', 'longitude'] + ([weight] if weight else [])
+    HeatMap(points[columns].to_numpy().tolist(), radius=radius).add_to(m)
+    return m
+
+
+# Peta marker gempa terkuat
+def build_strongest_map(events):
+    m = folium.Map(location=[events['latitude'].mean(), events['longitude'].mean()], zoom_start=5)
+    for _, row in events.iterrows():
+        folium.Marker(
+            location=[row['latitude'], row['longitude']],
+            popup=(
+                f"<b>Lokasi:</b> {row['location']}<br>"
+                f"<b>Magnitudo:</b> {row['magnitude']}<br>"
+                f"<b>Tahun:</b> {pd.to_datetime(row['datetime']).year}"
+            ),
+            icon=folium.Icon(color='red', icon='info-sign')
+        ).add_to(m)
+    return m
+
+
+# Batas cache HTML peta (jumlah entri dan total ukuran)
+MAP_CACHE_ENTRIES = 64
+MAP_CACHE_BYTES = 256 * 2**20
+
+
+# Cache LRU HTML peta yang sudah di-serialize, dipakai bersama semua sesi.
+# Kunci: (jenis peta, parameter filter, versi dataset).
+class MapHtmlCache:
+    def __init__(self, max_entries=MAP_CACHE_ENTRIES, max_bytes=MAP_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            html = self.entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key, html):
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = html
+            self.size += len(html)
+            while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_bytes):
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+map_cache = MapHtmlCache()
+
+
+def map_key(map_type, params, version):
+    digest = hashlib.sha1(repr(params).encode('utf-8')).hexdigest()
+    return map_type, digest, version
+
+
+# HTML peta dari cache; builder() (membangun folium.Map) hanya dipanggil saat miss
+def cached_map_html(map_type, params, version, builder):
+    key = map_key(map_type, params, version)
+    html = map_cache.get(key)
+    if html is None:
+        html = builder().get_root().render()
+        map_cache.put(key, html)
+    return html
+
+
+# Tampilkan HTML peta lewat komponen statis (tanpa round-trip st_folium).
+# Peta tetap bisa digeser dan di-zoom di dalam iframe. st.iframe dipakai jika
+# tersedia (Streamlit baru), selain itu components.html.
+def show_map(html, width=700, height=500):
+    if hasattr(st, 'iframe'):
+        st.iframe(html, width=width, height=height)
+    else:
+        components.html(html, width=width, height=height)
@@ -0,0 +1,119 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Selang pengecekan versi dataset oleh scheduler (detik)
+POLL_SECONDS = 5.0
+
+
+# Artefak satu versi dataset. Setiap artefak adalah Future, sehingga pembaca
+# hanya menunggu artefak yang benar-benar dipakai, bukan seluruh pembangunan.
+class Snapshot:
+    def __init__(self, version, names):
+        self.version = version
+        self.futures = {name: Future() for name in names}
+
+    def __contains__(self, name):
+        return name in self.futures
+
+    def __getitem__(self, name):
+        return self.futures[name].result()
+
+    def done(self):
+        return all(future.done() for future in self.futures.values())
+
+
+# Scheduler precompute di background dengan cache stale-while-revalidate.
+#
+# Thread scheduler memeriksa versi dataset secara berkala (atau segera setelah
+# poke()). Saat versi berubah, semua artefak dibangun ulang di thread pool
+# tahap demi tahap: setiap builder di satu tahap berjalan paralel dan menerima
+# (versi, artefak tahap sebelumnya). Builder harus berupa fungsi biasa (tanpa
+# pemanggilan Streamlit). Selama pembangunan ulang, pemanggil tetap mendapat
+# snapshot lengkap terakhir; snapshot baru dipasang setelah semua tahap selesai.
+# Saat belum ada snapshot lengkap (awal server), snapshot yang sedang dibangun
+# langsung disajikan dan pembaca menunggu per artefak. Jika pembangunan gagal,
+# snapshot lama dipakai terus dan versi yang gagal tidak dicoba ulang sampai
+# versinya berubah lagi.
+class Precomputer:
+    def __init__(self, version_fn, stages, poll_seconds=POLL_SECONDS, max_workers=4):
+        self.version_fn = version_fn
+        self.stages = stages
+        self.poll_seconds = poll_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='precompute')
+        self.current = None
+        self.building = None
+        self.failed_version = None
+        self.error = None
+        self.started = threading.Event()
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='precompute-scheduler', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+        self.thread.join()
+        self.executor.shutdown(wait=False)
+
+    # Minta scheduler memeriksa versi dataset sekarang juga
+    def poke(self):
+        self.wake.set()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            self.wake.clear()
+            try:
+                version = self.version_fn()
+            except Exception as exc:  # file sedang diganti; coba lagi pada giliran berikutnya
+                self.error = exc
+                version = None
+            served = self.current.version if self.current is not None else None
+            if version is not None and version not in (served, self.failed_version):
+                self._build(version)
+            self.wake.wait(self.poll_seconds)
+
+    def _build(self, version):
+        snapshot = Snapshot(version, [name for stage in self.stages for name in stage])
+        self.building = snapshot
+        self.started.set()
+        artifacts = {}
+        try:
+            for stage in self.stages:
+                futures = {name: self.executor.submit(builder, version, dict(artifacts))
+                           for name, builder in stage.items()}
+                for name, future in futures.items():
+                    artifacts[name] = future.result()
+                    snapshot.futures[name].set_result(artifacts[name])
+        except Exception as exc:
+            self.error = exc
+            self.failed_version = version
+            for future in snapshot.futures.values():
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            self.current = snapshot
+            self.error = None
+            self.failed_version = None
+        finally:
+            self.building = None
+
+    # Snapshot lengkap terakhir; sebelum ada, snapshot yang sedang dibangun
+    def snapshot(self, timeout=None):
+        current = self.current
+        if current is not None:
+            return current
+        if not self.started.wait(timeout):
+            raise TimeoutError('Precompute awal belum dimulai')
+        current = self.current or self.building
+        if current is None:
+            raise RuntimeError(f'Precompute gagal: {self.error}') from self.error
+        return current
+
+    # True jika snapshot yang disajikan sudah usang dan versi baru sedang dibangun
+    @property
+    def refreshing(self):
+        return self.building is not None and self.current is not None
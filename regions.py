@@ -0,0 +1,337 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# File GeoJSON batas wilayah (provinsi) lokal. Jika tidak ada, batas persegi
+# `regions_detailed` dipakai sebagai poligon pengganti.
+REGIONS_GEOJSON = 'wilayah_indonesia.geojson'
+
+# Nama properti GeoJSON yang dicoba untuk nama provinsi dan pulau
+PROVINCE_KEYS = ['provinsi', 'Provinsi', 'PROVINSI', 'Propinsi', 'PROPINSI', 'NAME_1', 'name', 'NAME']
+ISLAND_KEYS = ['pulau', 'Pulau', 'PULAU', 'island']
+
+# Pemetaan provinsi ke pulau/kelompok pulau utama
+PROVINCE_ISLAND = {
+    'Aceh': 'Sumatera',
+    'Sumatera Utara': 'Sumatera',
+    'Sumatera Barat': 'Sumatera',
+    'Riau': 'Sumatera',
+    'Kepulauan Riau': 'Sumatera',
+    'Jambi': 'Sumatera',
+    'Sumatera Selatan': 'Sumatera',
+    'Kepulauan Bangka Belitung': 'Sumatera',
+    'Bangka Belitung': 'Sumatera',
+    'Bengkulu': 'Sumatera',
+    'Lampung': 'Sumatera',
+    'DKI Jakarta': 'Jawa',
+    'Jakarta Raya': 'Jawa',
+    'Banten': 'Jawa',
+    'Jawa Barat': 'Jawa',
+    'Jawa Tengah': 'Jawa',
+    'DI Yogyakarta': 'Jawa',
+    'Daerah Istimewa Yogyakarta': 'Jawa',
+    'Yogyakarta': 'Jawa',
+    'Jawa Timur': 'Jawa',
+    'Bali': 'Bali dan Nusa Tenggara',
+    'Nusa Tenggara Barat': 'Bali dan Nusa Tenggara',
+    'Nusa Tenggara Timur': 'Bali dan Nusa Tenggara',
+    'Kalimantan Barat': 'Kalimantan',
+    'Kalimantan Tengah': 'Kalimantan',
+    'Kalimantan Selatan': 'Kalimantan',
+    'Kalimantan Timur': 'Kalimantan',
+    'Kalimantan Utara': 'Kalimantan',
+    'Sulawesi Utara': 'Sulawesi',
+    'Gorontalo': 'Sulawesi',
+    'Sulawesi Tengah': 'Sulawesi',
+    'Sulawesi Barat': 'Sulawesi',
+    'Sulawesi Selatan': 'Sulawesi',
+    'Sulawesi Tenggara': 'Sulawesi',
+    'Maluku': 'Maluku',
+    'Maluku Utara': 'Maluku',
+    'Papua': 'Papua',
+    'Papua Barat': 'Papua',
+    'Papua Barat Daya': 'Papua',
+    'Papua Tengah': 'Papua',
+    'Papua Pegunungan': 'Papua',
+    'Papua Selatan': 'Papua',
+}
+
+
+def _normalize_name(name):
+    return re.sub(r'[^A-Z]', '', str(name).upper())
+
+
+_PROVINCE_ISLAND_NORMALIZED = {_normalize_name(k): v for k, v in PROVINCE_ISLAND.items()}
+
+
+# Orientasi titik c terhadap garis a->b (bisa berupa array)
+def _orient(ax, ay, bx, by, cx, cy):
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+# Grid seragam untuk mempercepat point-in-polygon.
+#
+# Setiap sel grid diklasifikasikan sekali saat dibangun:
+# - sel yang tidak dilewati tepi poligon mana pun mendapat label langsung
+#   (poligon yang memuat titik tengah sel, atau -1 jika di luar semua poligon);
+# - sel batas menyimpan daftar tepi yang melewatinya. Titik di sel batas diuji
+#   secara eksak: status "di dalam" titik tengah sel dibalik setiap kali ruas
+#   titik tengah -> titik memotong tepi poligon (aturan genap-ganjil).
+#
+# Jika poligon saling tumpang tindih, poligon yang lebih dulu didefinisikan
+# menang sehingga setiap kejadian hanya dihitung di satu wilayah.
+class RegionGrid:
+    def __init__(self, names, islands, rings, cell_size=0.1):
+        self.names = list(names)
+        self.islands = list(islands)
+        self.cell_size = float(cell_size)
+
+        # Kumpulkan semua tepi (x1, y1, x2, y2, poligon) dari semua ring
+        edges = []
+        for polygon_id, polygon_rings in enumerate(rings):
+            for ring in polygon_rings:
+                ring = np.asarray(ring, dtype=float)[:, :2]
+                if len(ring) < 3:
+                    continue
+                if not np.array_equal(ring[0], ring[-1]):
+                    ring = np.vstack([ring, ring[:1]])
+                edge = np.column_stack([ring[:-1], ring[1:], np.full(len(ring) - 1, polygon_id)])
+                edges.append(edge)
+        edges = np.vstack(edges) if edges else np.empty((0, 5))
+        edges = edges[(edges[:, 0] != edges[:, 2]) | (edges[:, 1] != edges[:, 3])]
+        self.edge_x1, self.edge_y1, self.edge_x2, self.edge_y2 = (edges[:, i] for i in range(4))
+        self.edge_polygon = edges[:, 4].astype(np.int64)
+
+        all_x = np.concatenate([self.edge_x1, self.edge_x2])
+        all_y = np.concatenate([self.edge_y1, self.edge_y2])
+        self.lon_min, self.lat_min = all_x.min(), all_y.min()
+        self.n_cols = int(np.floor((all_x.max() - self.lon_min) / self.cell_size)) + 1
+        self.n_rows = int(np.floor((all_y.max() - self.lat_min) / self.cell_size)) + 1
+
+        self._build_boundary_cells()
+        self._build_cell_labels()
+
+    # Nama pulau unik sesuai urutan kemunculan
+    @property
+    def island_names(self):
+        return list(dict.fromkeys(self.islands))
+
+    def bounds(self, island):
+        mask = np.isin(self.edge_polygon, [i for i, name in enumerate(self.islands) if name == island])
+        xs = np.concatenate([self.edge_x1[mask], self.edge_x2[mask]])
+        ys = np.concatenate([self.edge_y1[mask], self.edge_y2[mask]])
+        return {'lat_min': float(ys.min()), 'lat_max': float(ys.max()),
+                'lon_min': float(xs.min()), 'lon_max': float(xs.max())}
+
+    def _cell_index(self, lat, lon):
+        col = np.floor((lon - self.lon_min) / self.cell_size).astype(np.int64)
+        row = np.floor((lat - self.lat_min) / self.cell_size).astype(np.int64)
+        valid = (col >= 0) & (col < self.n_cols) & (row >= 0) & (row < self.n_rows)
+        return row * self.n_cols + col, valid
+
+    # Pasangan (sel, tepi) untuk setiap tepi yang memotong persegi sel
+    def _build_boundary_cells(self):
+        size = self.cell_size
+        c0 = np.clip(np.floor((np.minimum(self.edge_x1, self.edge_x2) - self.lon_min) / size), 0, self.n_cols - 1).astype(np.int64)
+        c1 = np.clip(np.floor((np.maximum(self.edge_x1, self.edge_x2) - self.lon_min) / size), 0, self.n_cols - 1).astype(np.int64)
+        r0 = np.clip(np.floor((np.minimum(self.edge_y1, self.edge_y2) - self.lat_min) / size), 0, self.n_rows - 1).astype(np.int64)
+        r1 = np.clip(np.floor((np.maximum(self.edge_y1, self.edge_y2) - self.lat_min) / size), 0, self.n_rows - 1).astype(np.int64)
+
+        # Kandidat: semua sel di bounding box setiap tepi
+        width, height = c1 - c0 + 1, r1 - r0 + 1
+        per_edge = width * height
+        edge_id = np.repeat(np.arange(len(per_edge)), per_edge)
+        offset = np.arange(per_edge.sum()) - np.repeat(np.cumsum(per_edge) - per_edge, per_edge)
+        col = c0[edge_id] + offset % width[edge_id]
+        row = r0[edge_id] + offset // width[edge_id]
+
+        # Uji sumbu pemisah: tepi memotong sel jika sudut-sudut sel tidak
+        # semuanya berada di sisi yang sama dari garis tepi
+        x1, y1 = self.edge_x1[edge_id], self.edge_y1[edge_id]
+        x2, y2 = self.edge_x2[edge_id], self.edge_y2[edge_id]
+        left = self.lon_min + col * size
+        bottom = self.lat_min + row * size
+        corners = np.stack([
+            _orient(x1, y1, x2, y2, left, bottom),
+            _orient(x1, y1, x2, y2, left + size, bottom),
+            _orient(x1, y1, x2, y2, left, bottom + size),
+            _orient(x1, y1, x2, y2, left + size, bottom + size),
+        ])
+        hit = (corners.min(axis=0) <= 0) & (corners.max(axis=0) >= 0)
+
+        cell = (row * self.n_cols + col)[hit]
+        edge_id = edge_id[hit]
+        order = np.argsort(cell, kind='stable')
+        self.pair_cell = cell[order]
+        self.pair_edge = edge_id[order]
+        self.is_boundary = np.zeros(self.n_rows * self.n_cols, dtype=bool)
+        self.is_boundary[self.pair_cell] = True
+        self.pair_start = np.searchsorted(self.pair_cell, np.arange(self.n_rows * self.n_cols + 1))
+
+    # Status titik tengah setiap sel terhadap setiap poligon (scanline per baris)
+    def _build_cell_labels(self):
+        n_polygons = len(self.names)
+        centre_x = self.lon_min + (np.arange(self.n_cols) + 0.5) * self.cell_size
+        centre_inside = np.zeros((self.n_rows, self.n_cols, n_polygons), dtype=bool)
+        for row in range(self.n_rows):
+            y = self.lat_min + (row + 0.5) * self.cell_size
+            crossing = (self.edge_y1 > y) != (self.edge_y2 > y)
+            if not crossing.any():
+                continue
+            x1, y1 = self.edge_x1[crossing], self.edge_y1[crossing]
+            x2, y2 = self.edge_x2[crossing], self.edge_y2[crossing]
+            x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+            polygon = self.edge_polygon[crossing]
+            for polygon_id in np.unique(polygon):
+                xs = np.sort(x_cross[polygon == polygon_id])
+                centre_inside[row, :, polygon_id] = np.searchsorted(xs, centre_x) % 2 == 1
+        self.centre_inside = centre_inside.reshape(self.n_rows * self.n_cols, n_polygons)
+
+        any_inside = self.centre_inside.any(axis=1)
+        self.cell_label = np.where(any_inside, self.centre_inside.argmax(axis=1), -1).astype(np.int64)
+
+    # Label poligon untuk setiap titik (indeks ke `names`, -1 jika di luar)
+    def assign(self, lat, lon):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        labels = np.full(lat.shape, -1, dtype=np.int64)
+        cell, valid = self._cell_index(lat, lon)
+        valid &= ~(np.isnan(lat) | np.isnan(lon))
+
+        # Sel yang sepenuhnya di dalam/di luar: cukup lookup label sel
+        fast = valid.copy()
+        fast[valid] = ~self.is_boundary[cell[valid]]
+        labels[fast] = self.cell_label[cell[fast]]
+
+        # Sel batas: uji eksak terhadap tepi yang melewati sel saja
+        slow = np.flatnonzero(valid & ~fast)
+        if slow.size:
+            labels[slow] = self._assign_boundary(lat[slow], lon[slow], cell[slow])
+        return labels
+
+    def _assign_boundary(self, lat, lon, cell):
+        size = self.cell_size
+        start = self.pair_start[cell]
+        count = self.pair_start[cell + 1] - start
+        point = np.repeat(np.arange(len(cell)), count)
+        pair = np.repeat(start, count) + (np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count))
+        edge = self.pair_edge[pair]
+
+        px, py = lon[point], lat[point]
+        col = cell[point] % self.n_cols
+        row = cell[point] // self.n_cols
+        cx = self.lon_min + (col + 0.5) * size
+        cy = self.lat_min + (row + 0.5) * size
+        x1, y1, x2, y2 = self.edge_x1[edge], self.edge_y1[edge], self.edge_x2[edge], self.edge_y2[edge]
+
+        # Ruas titik tengah -> titik memotong tepi poligon
+        crosses = (((_orient(x1, y1, x2, y2, cx, cy) > 0) != (_orient(x1, y1, x2, y2, px, py) > 0)) &
+                   ((_orient(cx, cy, px, py, x1, y1) > 0) != (_orient(cx, cy, px, py, x2, y2) > 0)))
+
+        n_polygons = len(self.names)
+        parity = np.zeros(len(cell) * n_polygons, dtype=np.int64)
+        np.add.at(parity, point[crosses] * n_polygons + self.edge_polygon[edge[crosses]], 1)
+        inside = self.centre_inside[cell] ^ (parity.reshape(len(cell), n_polygons) % 2 == 1)
+        return np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
+
+
+# Ring koordinat dari geometri GeoJSON (Polygon/MultiPolygon)
+def _geometry_rings(geometry):
+    if geometry['type'] == 'Polygon':
+        return list(geometry['coordinates'])
+    if geometry['type'] == 'MultiPolygon':
+        return [ring for polygon in geometry['coordinates'] for ring in polygon]
+    raise ValueError(f"Tipe geometri tidak didukung: {geometry['type']}")
+
+
+def _first_property(properties, keys):
+    for key in keys:
+        if properties.get(key):
+            return str(properties[key])
+    return None
+
+
+# Bangun grid dari file GeoJSON batas provinsi
+def grid_from_geojson(path=REGIONS_GEOJSON, cell_size=0.1):
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+
+    names, islands, rings = [], [], []
+    for feature in collection['features']:
+        properties = feature.get('properties') or {}
+        name = _first_property(properties, PROVINCE_KEYS) or f"Wilayah {len(names) + 1}"
+        island = (_first_property(properties, ISLAND_KEYS)
+                  or _PROVINCE_ISLAND_NORMALIZED.get(_normalize_name(name), name))
+        names.append(name)
+        islands.append(island)
+        rings.append(_geometry_rings(feature['geometry']))
+    return RegionGrid(names, islands, rings, cell_size)
+
+
+# Pengganti RegionGrid untuk batas persegi {nama: {lat_min, lat_max, lon_min,
+# lon_max}}. Batas inklusif seperti filter persegi versi awal, sehingga titik
+# tepat di tepi tetap masuk wilayah. Jika persegi tumpang tindih, persegi
+# terkecil menang (persegi pulau kecil seperti Bali dan Nusa Tenggara berada di
+# dalam persegi pulau besar di sekitarnya); luas sama diputus menurut urutan
+# definisi. Jumlah wilayah kecil, jadi setiap persegi cukup diuji langsung
+# secara vektor tanpa grid sel.
+class BoundsGrid:
+    def __init__(self, bounds_by_region):
+        self.names = list(bounds_by_region)
+        self.islands = list(self.names)
+        self.region_bounds = [dict(bounds_by_region[name]) for name in self.names]
+
+    @property
+    def island_names(self):
+        return list(dict.fromkeys(self.islands))
+
+    def bounds(self, island):
+        b = self.region_bounds[self.names.index(island)]
+        return {key: float(b[key]) for key in ('lat_min', 'lat_max', 'lon_min', 'lon_max')}
+
+    # Label persegi untuk setiap titik (indeks ke `names`, -1 jika di luar)
+    def assign(self, lat, lon):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        labels = np.full(lat.shape, -1, dtype=np.int64)
+        areas = [(b['lat_max'] - b['lat_min']) * (b['lon_max'] - b['lon_min']) for b in self.region_bounds]
+        # Prioritas terendah lebih dulu sehingga persegi terkecil menimpa label terakhir
+        for region_id in sorted(range(len(self.names)), key=lambda i: (areas[i], i), reverse=True):
+            b = self.region_bounds[region_id]
+            inside = ((lat >= b['lat_min']) & (lat <= b['lat_max']) &
+                      (lon >= b['lon_min']) & (lon <= b['lon_max']))
+            labels[inside] = region_id
+        return labels
+
+
+# Bangun pengganti grid dari batas persegi; cell_size diabaikan
+def grid_from_bounds(bounds_by_region, cell_size=0.1):
+    return BoundsGrid(bounds_by_region)
+
+
+# Grid dari GeoJSON lokal jika tersedia, jika tidak dari batas persegi
+def load_region_grid(fallback_bounds, path=REGIONS_GEOJSON, cell_size=0.1):
+    if path and os.path.exists(path):
+        return grid_from_geojson(path, cell_size)
+    return grid_from_bounds(fallback_bounds, cell_size)
+
+
+# Tambahkan kolom 'provinsi' dan 'pulau' (kategorikal) ke DataFrame
+def assign_regions(data, grid):
+    labels = grid.assign(data['latitude'].to_numpy(dtype=float), data['longitude'].to_numpy(dtype=float))
+
+    # Satu provinsi bisa terdiri dari beberapa fitur GeoJSON
+    province_names = list(dict.fromkeys(grid.names))
+    island_names = grid.island_names
+    province_of_polygon = np.array([province_names.index(name) for name in grid.names], dtype=np.int64)
+    island_of_polygon = np.array([island_names.index(name) for name in grid.islands], dtype=np.int64)
+    assigned = labels >= 0
+
+    data['provinsi'] = pd.Categorical.from_codes(
+        np.where(assigned, province_of_polygon[np.maximum(labels, 0)], -1), categories=province_names)
+    data['pulau'] = pd.Categorical.from_codes(
+        np.where(assigned, island_of_polygon[np.maximum(labels, 0)], -1), categories=island_names)
+    return data
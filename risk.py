@@ -0,0 +1,61 @@
+import hashlib
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import classification_report
+from sklearn.model_selection import train_test_split
+
+# Fitur model risiko dan ambang magnitudo risiko tinggi
+RISK_FEATURES = ['latitude', 'longitude', 'depth']
+RISK_MAGNITUDE = 6
+
+# Kedalaman (km) yang dievaluasi pada grid prediksi
+GRID_DEPTHS = (10, 35, 70, 150, 300, 500)
+
+
+# Versi model: berubah jika dataset atau parameter model berubah
+def model_version(dataset_version, random_state=42, test_size=0.2):
+    key = f"{dataset_version}|{RISK_FEATURES}|{RISK_MAGNITUDE}|{random_state}|{test_size}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+# Latih Random Forest: High (1) jika magnitudo > 6, Low (0) jika magnitudo <= 6
+def train_risk_model(data, random_state=42, test_size=0.2):
+    X = data[RISK_FEATURES].dropna()
+    y = np.where(data.loc[X.index, 'magnitude'] > RISK_MAGNITUDE, 1, 0)
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+    model = RandomForestClassifier(random_state=random_state, class_weight='balanced', n_jobs=-1)
+    model.fit(X_train.to_numpy(), y_train)
+
+    y_pred = model.predict(X_test.to_numpy())
+    report = classification_report(y_test, y_pred)
+    return model, report, X_test, y_pred
+
+
+# Sumbu grid lat/lon reguler yang menutupi seluruh data
+def grid_axes(lat_min, lat_max, lon_min, lon_max, resolution):
+    lats = np.arange(lat_min, lat_max + resolution / 2, resolution)
+    lons = np.arange(lon_min, lon_max + resolution / 2, resolution)
+    return lats, lons
+
+
+# Probabilitas risiko tinggi pada grid (depth, lat, lon).
+# Fitur dibangun dan diprediksi per potongan agar memori tetap kecil
+# berapa pun ukuran grid.
+def predict_risk_grid(model, lats, lons, depths=GRID_DEPTHS, chunk_size=200_000):
+    shape = (len(depths), len(lats), len(lons))
+    total = int(np.prod(shape))
+    depths = np.asarray(depths, dtype=float)
+    high_class = list(model.classes_).index(1) if 1 in model.classes_ else None
+
+    probability = np.zeros(total, dtype=np.float32)
+    if high_class is None:
+        return probability.reshape(shape)
+
+    for start in range(0, total, chunk_size):
+        index = np.arange(start, min(start + chunk_size, total))
+        d, i, j = np.unravel_index(index, shape)
+        features = np.column_stack([lats[i], lons[j], depths[d]])
+        probability[index] = model.predict_proba(features)[:, high_class]
+    return probability.reshape(shape)
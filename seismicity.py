@@ -0,0 +1,65 @@
+import numpy as np
+
+# Batas grid default untuk seluruh kepulauan Indonesia
+INDONESIA_BOUNDS = {'lat_min': -12.0, 'lat_max': 7.0, 'lon_min': 94.0, 'lon_max': 142.0}
+
+KM_PER_DEGREE = 111.19
+
+DAYS_PER_YEAR = 365.25
+
+
+# Jumlah kejadian per sel grid (baris = lintang, kolom = bujur)
+def gridded_counts(lat, lon, bounds, resolution):
+    n_rows = int(np.floor((bounds['lat_max'] - bounds['lat_min']) / resolution)) + 1
+    n_cols = int(np.floor((bounds['lon_max'] - bounds['lon_min']) / resolution)) + 1
+    row = np.floor((np.asarray(lat, dtype=float) - bounds['lat_min']) / resolution)
+    col = np.floor((np.asarray(lon, dtype=float) - bounds['lon_min']) / resolution)
+    valid = (row >= 0) & (row < n_rows) & (col >= 0) & (col < n_cols)
+    index = row[valid].astype(np.int64) * n_cols + col[valid].astype(np.int64)
+    counts = np.bincount(index, minlength=n_rows * n_cols).reshape(n_rows, n_cols).astype(float)
+    lats = bounds['lat_min'] + (np.arange(n_rows) + 0.5) * resolution
+    lons = bounds['lon_min'] + (np.arange(n_cols) + 0.5) * resolution
+    return counts, lats, lons
+
+
+# Kernel Gaussian Frankel exp(-d^2/c^2), dipotong pada 3c dan dinormalisasi ke jumlah 1.
+# Jarak bujur dikoreksi dengan cos(lintang tengah) grid.
+def gaussian_kernel(correlation_km, resolution, centre_lat=0.0):
+    km_lat = KM_PER_DEGREE * resolution
+    km_lon = km_lat * np.cos(np.radians(centre_lat))
+    half_rows = max(int(np.ceil(3 * correlation_km / km_lat)), 1)
+    half_cols = max(int(np.ceil(3 * correlation_km / km_lon)), 1)
+    dy = np.arange(-half_rows, half_rows + 1)[:, None] * km_lat
+    dx = np.arange(-half_cols, half_cols + 1)[None, :] * km_lon
+    distance2 = dx ** 2 + dy ** 2
+    kernel = np.exp(-distance2 / correlation_km ** 2)
+    kernel[distance2 > (3 * correlation_km) ** 2] = 0.0
+    return kernel / kernel.sum()
+
+
+# Konvolusi linear 2D lewat FFT (tanpa efek wrap-around), hasil seukuran grid
+def fft_convolve2d(grid, kernel):
+    shape = (grid.shape[0] + kernel.shape[0] - 1, grid.shape[1] + kernel.shape[1] - 1)
+    result = np.fft.irfft2(np.fft.rfft2(grid, shape) * np.fft.rfft2(kernel, shape), shape)
+    row0, col0 = kernel.shape[0] // 2, kernel.shape[1] // 2
+    result = result[row0:row0 + grid.shape[0], col0:col0 + grid.shape[1]]
+    return np.clip(result, 0.0, None)
+
+
+# Lama pengamatan (tahun) untuk rentang tanggal inklusif
+def observed_years(start_date, end_date):
+    days = (np.datetime64(end_date, 'D') - np.datetime64(start_date, 'D')).astype(np.int64) + 1
+    return max(int(days), 0) / DAYS_PER_YEAR
+
+
+# Laju seismisitas ter-smoothing (kejadian M >= min_magnitude per tahun per sel)
+def smoothed_rate(lat, lon, magnitude, years, min_magnitude=4.0, correlation_km=50.0,
+                  resolution=0.1, bounds=None):
+    bounds = bounds or INDONESIA_BOUNDS
+    magnitude = np.asarray(magnitude, dtype=float)
+    above = magnitude >= min_magnitude
+    counts, lats, lons = gridded_counts(np.asarray(lat)[above], np.asarray(lon)[above], bounds, resolution)
+    centre_lat = (bounds['lat_min'] + bounds['lat_max']) / 2
+    kernel = gaussian_kernel(correlation_km, resolution, centre_lat)
+    rate = fft_convolve2d(counts, kernel) / max(years, 1e-9)
+    return lats, lons, rate
@@ -1,47 +1,243 @@
+from datetime import date
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import streamlit as st
-from folium.plugins import HeatMap
-from streamlit_folium import st_folium
 import folium
+import numpy as np
 from sklearn.cluster import KMeans
 from wordcloud import WordCloud
 
-# Fungsi untuk memfilter data berdasarkan rentang tahun
-def filter_data_by_year_range(data, start_year, end_year):
-    data['Year'] = pd.to_datetime(data['datetime'], errors='coerce').dt.year
-    return data[(data['Year'] >= start_year) & (data['Year'] <= end_year)]
-
-# Load dataset
-file_path = 'katalog_gempa2.csv'  # Ganti dengan path file Anda
-data = pd.read_csv(file_path, sep=';', low_memory=False)
-
-# Definisi wilayah lebih rinci berdasarkan pulau utama dengan cakupan penuh tanpa jeda
-regions_detailed = {
-    'Sumatera': {'lat_min': -6.5, 'lat_max': 6.5, 'lon_min': 94.5, 'lon_max': 106.5},
-    'Jawa': {'lat_min': -9.5, 'lat_max': -4.5, 'lon_min': 105.5, 'lon_max': 115.5},
-    'Kalimantan': {'lat_min': -4.5, 'lat_max': 3.5, 'lon_min': 108.5, 'lon_max': 119.5},
-    'Sulawesi': {'lat_min': -5.5, 'lat_max': 2.5, 'lon_min': 118.5, 'lon_max': 125.5},
-    'Papua': {'lat_min': -11.5, 'lat_max': 0.5, 'lon_min': 130.5, 'lon_max': 141.5},
-    'Bali dan Nusa Tenggara': {'lat_min': -10.5, 'lat_max': -7.5, 'lon_min': 114.5, 'lon_max': 119.5},
-    'Maluku': {'lat_min': -8.5, 'lat_max': 2.5, 'lon_min': 125.5, 'lon_max': 135.5}
-}
-
-# Definisi pulau dan provinsi
-regions_islands = {
-    'Sumatera': ['Sumatera'],
-    'Jawa': ['Jawa'],
-    'Kalimantan': ['Kalimantan'],
-    'Sulawesi': ['Sulawesi'],
-    'Papua': ['Papua'],
-    'Bali dan Nusa Tenggara': ['Bali dan Nusa Tenggara'],
-    'Maluku': ['Maluku']
-}
+import aftershock
+import analytics
+import cumulative
+import locations
+import maps
+import precompute
+import seismicity
+import topk
+from analytics import filter_data_by_year_range
 
-# Streamlit UI
 st.set_page_config(page_title="Visualisasi Gempa Indonesia", layout="wide")
 
+# Lokasi dataset (dimuat oleh precompute di background)
+file_path = analytics.DATA_PATH  # Ganti dengan path file Anda
+# Mode multi-katalog: isi dengan katalog lain, mis. {'USGS': 'katalog_usgs.csv'}
+extra_catalogs = {}
+if extra_catalogs:
+    file_path = {'BMKG': file_path, **extra_catalogs}
+
+
+# Rentang tahun awal slider di halaman analisis
+DEFAULT_YEARS = (2008, 2024)
+
+
+# Jumlah kata awal halaman frekuensi kata (word cloud-nya dibangun di background)
+DEFAULT_WORDS = 100
+
+
+# Word cloud dari frekuensi token yang sudah dihitung saat membangun indeks
+def location_wordcloud(index, max_words):
+    frequencies = index.top_tokens(max_words).to_dict()
+    return WordCloud(width=800, height=400, background_color='white', max_words=max_words,
+                     colormap='inferno').generate_from_frequencies(frequencies).to_array()
+
+
+# Word cloud untuk jumlah kata selain nilai awal, di-cache per versi dataset
+@st.cache_data
+def load_location_wordcloud(version, _index, max_words):
+    return location_wordcloud(_index, max_words)
+
+
+# Parameter Omori-Utsu semua gempa utama, di-cache per versi dataset
+@st.cache_data
+def load_aftershock_fits(version, _data, min_magnitude):
+    return aftershock.fit_mainshocks(_data, min_magnitude)
+
+
+# Jumlah maksimum grid laju seismisitas yang disimpan cache (LRU, ~1.5 MB per
+# grid float32 seluruh Indonesia pada resolusi 0.05°)
+SEISMICITY_CACHE_ENTRIES = 32
+
+
+# Laju seismisitas ter-smoothing (Frankel), di-cache per set parameter
+@st.cache_data(max_entries=SEISMICITY_CACHE_ENTRIES)
+def load_seismicity_rate(version, _data, region, start_date, end_date, min_magnitude, correlation_km, resolution):
+    subset = analytics.filter_data_by_date_range(_data, start_date, end_date)
+    bounds = seismicity.INDONESIA_BOUNDS
+    if region is not None:
+        subset = analytics.filter_data_by_region(subset, region)
+        region_bounds = analytics.region_bounds(region)
+        bounds = {'lat_min': region_bounds['lat_min'] - 1, 'lat_max': region_bounds['lat_max'] + 1,
+                  'lon_min': region_bounds['lon_min'] - 1, 'lon_max': region_bounds['lon_max'] + 1}
+    # Laju per tahun dihitung dari lama rentang tanggal yang teramati, bukan jumlah tahun kalender
+    lats, lons, rate = seismicity.smoothed_rate(subset['latitude'], subset['longitude'], subset['magnitude'],
+                                                seismicity.observed_years(start_date, end_date), min_magnitude,
+                                                correlation_km, resolution, bounds)
+    return lats, lons, rate.astype(np.float32)
+
+
+# Rentang tanggal seluruh tahun terpilih, dibatasi ke tanggal yang ada di katalog
+def year_date_range(daily_cumulative, start_year, end_year):
+    first_day, last_day = daily_cumulative.date_bounds()
+    return (min(max(first_day, date(start_year, 1, 1)), last_day),
+            max(min(last_day, date(end_year, 12, 31)), first_day))
+
+
+# Rentang tanggal (presisi harian) di dalam rentang tahun slider. Key widget
+# memuat rentang tahun sehingga pilihan direset ke seluruh rentang tahun
+# setiap kali slider berubah.
+def select_date_range(start_year, end_year, region=None):
+    default = year_date_range(snapshot['harian'], start_year, end_year)
+    selected = st.date_input('Pilih Rentang Tanggal:', value=default, min_value=default[0], max_value=default[1],
+                             key=f'tanggal_{region}_{start_year}_{end_year}')
+    if len(selected) != 2:
+        st.info('Pilih tanggal akhir rentang; sementara memakai seluruh rentang tahun.')
+        return default
+    return tuple(selected)
+
+
+# Statistik rentang tanggal, dijawab dari array kumulatif
+def show_date_range_statistics(start_date, end_date, region=None):
+    daily_cumulative = snapshot['harian']
+    stats = daily_cumulative.totals(start_date, end_date, region)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric('Jumlah Gempa', f"{stats['jumlah']:,}")
+    col2.metric('Rata-rata Magnitudo', f"{stats['rata_rata_magnitudo']:.2f}" if stats['jumlah'] else '-')
+    col3.metric('Rata-rata Kedalaman (km)', f"{stats['rata_rata_kedalaman']:.1f}" if stats['jumlah'] else '-')
+    col4.metric('Energi Total (Mw setara)', f"{stats['magnitudo_ekuivalen']:.2f}" if stats['jumlah'] else '-',
+                help=f"Momen seismik total {stats['momen_total']:.3g} N·m")
+
+    daily = daily_cumulative.daily_counts(start_date, end_date, region)
+    if not daily.empty:
+        fig, ax = plt.subplots(figsize=(10, 3))
+        ax.plot(daily.index, daily.values, color='#1E90FF', linewidth=0.8)
+        ax.set_title(f'Jumlah Gempa per Hari ({start_date} - {end_date})', fontsize=14, fontweight='bold')
+        ax.set_ylabel('Jumlah Gempa', fontsize=12)
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+        st.pyplot(fig)
+
+
+# Kolom pencarian nama tempat; mengembalikan kueri dan baris `frame` yang cocok.
+# Spasi di akhir kueri dipertahankan: kata terakhir lalu dicocokkan persis.
+def location_search(frame, key):
+    query = st.text_input('🔎 Cari Lokasi (mis. Sumba, Seram):', key=key,
+                          help='Kata terakhir juga cocok sebagai awalan (mis. "Sum" untuk Sumba); '
+                               'akhiri dengan spasi untuk mencocokkan kata persis.').lstrip()
+    if not query.strip():
+        return '', frame
+    # Kueri tanpa huruf (mis. '123') tidak menghasilkan token: bukan pencarian
+    if not locations.tokenize(query):
+        st.caption(f"'{query.strip()}' tidak berisi kata; pencarian lokasi diabaikan.")
+        return '', frame
+    matched = pd.Series(snapshot['lokasi'].mask(query), index=data.index)
+    frame = frame[matched.reindex(frame.index, fill_value=False).to_numpy()]
+    st.caption(f"{len(frame)} kejadian dengan lokasi memuat '{query.strip()}'.")
+    return query, frame
+
+
+# Kontrol lapisan laju seismisitas; mengembalikan parameter lapisan atau None
+def seismicity_controls(date_range, region=None):
+    if not st.checkbox('Tampilkan laju seismisitas ter-smoothing', key=f'rate_{region}'):
+        return None
+    col1, col2 = st.columns(2)
+    min_magnitude = col1.slider('Magnitudo minimum:', min_value=2.0, max_value=7.0, value=4.0, step=0.5, key=f'rate_mag_{region}')
+    correlation_km = col2.slider('Jarak korelasi (km):', min_value=10, max_value=150, value=50, step=10, key=f'rate_km_{region}')
+
+    _, _, rate = load_seismicity_rate(dataset_version, data, region, *date_range,
+                                      min_magnitude, correlation_km, 0.05)
+    if rate.max() <= 0:
+        st.warning(f"Tidak ada gempa M ≥ {min_magnitude} untuk menghitung laju seismisitas.")
+        return None
+    st.caption(f'Laju seismisitas: log10 jumlah gempa M ≥ {min_magnitude} per tahun per sel 0.05°, '
+               f'smoothing Gaussian {correlation_km} km, lama pengamatan '
+               f'{seismicity.observed_years(*date_range):.2f} tahun ({date_range[0]} - {date_range[1]}).')
+    return min_magnitude, correlation_km
+
+
+# Lapisan laju seismisitas di atas peta folium (tanpa lapisan jika params None)
+def add_seismicity_layer(m, date_range, region, seismicity_params):
+    if seismicity_params is None:
+        return m
+    min_magnitude, correlation_km = seismicity_params
+    lats, lons, rate = load_seismicity_rate(dataset_version, data, region, *date_range,
+                                            min_magnitude, correlation_km, 0.05)
+    # Skala log10, sel dengan laju < 0.1% maksimum dibuat transparan
+    log_rate = np.where(rate > rate.max() * 1e-3, np.log10(np.maximum(rate, 1e-12)), np.nan)
+    maps.add_raster_overlay(m, log_rate, lats, lons, name='Laju Seismisitas', cmap='YlOrRd', opacity=0.7)
+    folium.LayerControl().add_to(m)
+    return m
+
+
+# HTML heatmap halaman tahun; dipakai halaman dan precompute (filter awal)
+def year_heatmap_html(version, points, start_year, end_year, date_range, location_query='', seismicity_params=None):
+    centre = [points['latitude'].mean(), points['longitude'].mean()]
+    return maps.cached_map_html(
+        'heatmap_tahun', (start_year, end_year, date_range, location_query, seismicity_params), version,
+        lambda: add_seismicity_layer(maps.build_heatmap(points, centre, 5), date_range, None, seismicity_params))
+
+
+# HTML heatmap halaman pulau; dipakai halaman dan precompute (filter awal)
+def island_heatmap_html(version, points, region, start_year, end_year, date_range, location_query='',
+                        seismicity_params=None):
+    bounds = analytics.region_bounds(region)
+    centre = [(bounds['lat_min'] + bounds['lat_max']) / 2, (bounds['lon_min'] + bounds['lon_max']) / 2]
+    return maps.cached_map_html(
+        'heatmap_pulau', (region, start_year, end_year, date_range, location_query, seismicity_params), version,
+        lambda: add_seismicity_layer(maps.build_heatmap(points, centre, 6), date_range, region, seismicity_params))
+
+
+def _default_points(data, date_range, region=None):
+    if region is not None:
+        data = analytics.filter_data_by_region(data, region)
+    data = analytics.filter_data_by_date_range(filter_data_by_year_range(data, *DEFAULT_YEARS), *date_range)
+    return data[['latitude', 'longitude']].dropna()
+
+
+def _warm_heatmaps(version, artifacts, island):
+    data = artifacts['katalog'][0]
+    date_range = year_date_range(artifacts['harian'], *DEFAULT_YEARS)
+    year_heatmap_html(version, _default_points(data, date_range), *DEFAULT_YEARS, date_range)
+    island_heatmap_html(version, _default_points(data, date_range, island), island, *DEFAULT_YEARS, date_range)
+
+
+# Artefak yang dibangun di background setiap kali versi dataset berubah:
+# parsing + validasi, indeks, agregasi seluruh katalog, heatmap dengan filter
+# awal (cache HTML peta bersifat global) dan word cloud dengan jumlah kata awal.
+# Builder hanya memanggil fungsi biasa: fungsi st.cache_data butuh konteks
+# sesi Streamlit, dan fit gempa susulan (process pool) tetap dijalankan halaman.
+@st.cache_resource
+def start_precompute(file_path):
+    island = analytics.island_names()[0]
+    return precompute.Precomputer(lambda: analytics.dataset_version(file_path), [
+        {'katalog': lambda version, a: analytics.load_data(file_path, with_report=True)},
+        {
+            'topk': lambda version, a: topk.TopKIndex(a['katalog'][0]),
+            'harian': lambda version, a: cumulative.DailyCumulative(a['katalog'][0]),
+            'lokasi': lambda version, a: locations.LocationIndex(a['katalog'][0]),
+            'statistik': lambda version, a: analytics.summary_statistics(a['katalog'][0]),
+            'per_jam': lambda version, a: analytics.hourly_counts(a['katalog'][0]),
+        },
+        {
+            'heatmap': lambda version, a: _warm_heatmaps(version, a, island),
+            'word_cloud': lambda version, a: location_wordcloud(a['lokasi'], DEFAULT_WORDS),
+        },
+    ]).start()
+
+
+# Semua sesi memakai snapshot lengkap terakhir; saat dataset berubah snapshot
+# lama tetap disajikan sampai snapshot baru selesai dibangun di background.
+# Sesi pertama hanya menunggu artefak yang dibaca halamannya.
+precomputer = start_precompute(file_path)
+precomputer.poke()
+snapshot = precomputer.snapshot()
+dataset_version = snapshot.version
+data, quality_report = snapshot['katalog']
+if precomputer.refreshing:
+    st.sidebar.info('Dataset baru sedang diproses; menampilkan versi sebelumnya.')
+
+# Streamlit UI
 st.title('📊 **Visualisasi Data Gempa Indonesia**')
 st.markdown(
     """
@@ -61,6 +257,8 @@ page = st.sidebar.selectbox("Pilih Halaman", [
     "Visualisasi Berdasarkan Tahun", 
     "Distribusi Berdasarkan Pulau",
     "Korelasi dan Distribusi",
+    "Sekuens Gempa Susulan",
+    "Frekuensi Kata Lokasi",
 ])
 
 if page == "Beranda":
@@ -69,73 +267,85 @@ if page == "Beranda":
 
     # Menampilkan 10 Gempa Terkuat
     if 'magnitude' in data.columns and 'location' in data.columns and not data.empty:
-        gempa_terkuat = data.nlargest(10, 'magnitude').reset_index(drop=True)
-
         st.subheader("🔍 Gempa di Indonesia")
-        # Pastikan kolom 'datetime' dalam format datetime
-        data['datetime'] = pd.to_datetime(data['datetime'], errors='coerce')
-        
-        # Menghitung total jumlah gempa
-        total_gempa = len(data)
-        
-        # Menghitung jumlah gempa per hari
-        gempa_per_hari = data['datetime'].dt.date.value_counts()
-        
-        # Menghitung rata-rata jumlah gempa per hari
-        rata_rata_per_hari = gempa_per_hari.mean()
+        # Menghitung total jumlah gempa dan rata-rata jumlah gempa per hari
+        statistik = snapshot['statistik']
+        total_gempa = statistik['total_gempa']
+        rata_rata_per_hari = statistik['rata_rata_per_hari']
 
         # Menampilkan informasi di halaman beranda
         st.subheader("📊 Statistik Gempa")
         st.write(f"**Total Jumlah Gempa (2008-2024):** {total_gempa}")
         st.write(f"**Rata-rata Jumlah Gempa per Hari (2008-2024):** {rata_rata_per_hari:.2f}")
 
+        with st.expander("🧹 Laporan Kualitas Data"):
+            st.write(f"**Total baris di file:** {quality_report['total_baris']}")
+            st.write(f"**Baris tidak valid (dibuang):** {quality_report['baris_tidak_valid']}")
+            st.write(f"**Waktu tidak valid:** {quality_report['waktu_tidak_valid']}")
+            st.write(f"**Laporan ganda dihapus:** {quality_report['duplikat_dihapus']}")
+            if 'per_sumber' in quality_report:
+                st.write(f"**Sumber katalog:** {', '.join(quality_report['per_sumber'])}")
+                st.write(f"**Kejadian setelah penggabungan:** {quality_report['kejadian_gabungan']} "
+                         f"({quality_report['kejadian_multi_sumber']} dilaporkan lebih dari satu sumber)")
+            st.table(pd.DataFrame({
+                'Nilai Kosong': quality_report['nilai_kosong'],
+                'Di Luar Rentang': quality_report['di_luar_rentang'],
+            }).fillna(0).astype(int))
+
         st.subheader("🔍 10 Gempa Terkuat di Dataset")
-        st.table(gempa_terkuat[['location', 'magnitude', 'datetime']])
+        # Filter pulau dan tahun dijawab dari indeks top-k tanpa memindai katalog
+        col1, col2 = st.columns(2)
+        selected_islands = col1.multiselect('Filter Pulau:', analytics.island_names())
+        min_year, max_year = analytics.year_bounds(data)
+        start_year, end_year = col2.slider('Filter Tahun:', min_value=min_year, max_value=max_year, value=(min_year, max_year))
+        gempa_terkuat = snapshot['topk'].query(10, selected_islands or None, start_year, end_year)
+
+        if gempa_terkuat.empty:
+            st.warning("Tidak ada data gempa untuk filter yang dipilih.")
+        else:
+            st.table(gempa_terkuat[['location', 'magnitude', 'datetime']])
 
-        # Menambahkan kolom baru untuk lokasi dan tahun
-        gempa_terkuat['Year_Location'] = gempa_terkuat['location'] + ' (' + pd.to_datetime(gempa_terkuat['datetime']).dt.year.astype(str) + ')'
+            # Menambahkan kolom baru untuk lokasi dan tahun
+            gempa_terkuat['Year_Location'] = gempa_terkuat['location'] + ' (' + pd.to_datetime(gempa_terkuat['datetime']).dt.year.astype(str) + ')'
         
-        # Menampilkan Chart Magnitudo terhadap Lokasi (Datetime)
-        st.subheader("📊 Chart Magnitudo terhadap Lokasi (Tahun)")
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.bar(gempa_terkuat['Year_Location'], gempa_terkuat['magnitude'], color='orange')
-        ax.set_title('Magnitudo Gempa Terkuat Berdasarkan Lokasi dan Tahun', fontsize=16, fontweight='bold')
-        ax.set_xlabel('Lokasi (Tahun)', fontsize=14)
-        ax.set_ylabel('Magnitudo', fontsize=14)
-        ax.set_xticklabels(gempa_terkuat['Year_Location'], rotation=45, ha='right')
-        ax.grid(axis='y', linestyle='--', alpha=0.7)
-        st.pyplot(fig)
-
-        st.subheader("🗺️ Lokasi 10 Gempa Terkuat")
-        m = folium.Map(location=[gempa_terkuat['latitude'].mean(), gempa_terkuat['longitude'].mean()], zoom_start=5)
-        for _, row in gempa_terkuat.iterrows():
-            folium.Marker(
-                location=[row['latitude'], row['longitude']],
-                popup=(
-                    f"<b>Lokasi:</b> {row['location']}<br>"
-                    f"<b>Magnitudo:</b> {row['magnitude']}<br>"
-                    f"<b>Tahun:</b> {pd.to_datetime(row['datetime']).year}"
-                ),
-                icon=folium.Icon(color='red', icon='info-sign')
-            ).add_to(m)
-        st_folium(m , width=700, height=500)
+            # Menampilkan Chart Magnitudo terhadap Lokasi (Datetime)
+            st.subheader("📊 Chart Magnitudo terhadap Lokasi (Tahun)")
+            fig, ax = plt.subplots(figsize=(10, 6))
+            ax.bar(gempa_terkuat['Year_Location'], gempa_terkuat['magnitude'], color='orange')
+            ax.set_title('Magnitudo Gempa Terkuat Berdasarkan Lokasi dan Tahun', fontsize=16, fontweight='bold')
+            ax.set_xlabel('Lokasi (Tahun)', fontsize=14)
+            ax.set_ylabel('Magnitudo', fontsize=14)
+            ax.set_xticklabels(gempa_terkuat['Year_Location'], rotation=45, ha='right')
+            ax.grid(axis='y', linestyle='--', alpha=0.7)
+            st.pyplot(fig)
+
+            st.subheader("🗺️ Lokasi 10 Gempa Terkuat")
+            # HTML peta di-cache per (filter, versi dataset) dan ditampilkan statis
+            html = maps.cached_map_html('terkuat', (tuple(selected_islands), start_year, end_year), dataset_version,
+                                        lambda: maps.build_strongest_map(gempa_terkuat))
+            maps.show_map(html)
     else:
         st.warning("Dataset tidak lengkap atau kosong. Periksa kembali file Anda.")
 
 elif page == "Visualisasi Berdasarkan Tahun":
     st.title('📊 **Visualisasi Data Gempa Berdasarkan Tahun**')
 
-    min_year = int(data['datetime'].min()[:4])
-    max_year = int(data['datetime'].max()[:4])
-    start_year, end_year = st.slider('Pilih Rentang Tahun:', min_value=min_year, max_value=max_year, value=(2008, 2024))
+    min_year, max_year = analytics.year_bounds(data)
+    start_year, end_year = st.slider('Pilih Rentang Tahun:', min_value=min_year, max_value=max_year, value=DEFAULT_YEARS)
+    date_range = select_date_range(start_year, end_year)
+
+    filtered_data = analytics.filter_data_by_date_range(filter_data_by_year_range(data, start_year, end_year), *date_range)
 
-    filtered_data = filter_data_by_year_range(data, start_year, end_year)
+    st.subheader(f'📅 Statistik Gempa {date_range[0]} - {date_range[1]}')
+    show_date_range_statistics(*date_range)
+
+    location_query, filtered_data = location_search(filtered_data, 'cari_tahun')
 
     if filtered_data.empty:
         st.warning("Tidak ada data gempa untuk rentang tahun yang dipilih.")
     else:
         st.subheader(f'📈 Tren Aktivitas Gempa dari Tahun {start_year} hingga {end_year}')
-        activity_per_year = filtered_data.groupby('Year').size()
+        activity_per_year = analytics.yearly_counts(filtered_data)
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.plot(activity_per_year.index, activity_per_year.values, marker='o', linestyle='-', color='#FF6347')
         ax.set_title(f'Tren Aktivitas Gempa {start_year}-{end_year}', fontsize=16, fontweight='bold')
@@ -145,7 +355,7 @@ elif page == "Visualisasi Berdasarkan Tahun":
         st.pyplot(fig)
 
         st.subheader(f'📉 Rata-rata Magnitudo Gempa dari Tahun {start_year} hingga {end_year}')
-        average_magnitude = filtered_data.groupby('Year')['magnitude'].mean()
+        average_magnitude = analytics.yearly_mean(filtered_data, 'magnitude')
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.plot(average_magnitude.index, average_magnitude.values, marker='o', color='#32CD32')
         ax.set_title(f'Rata-rata Magnitudo Gempa {start_year}-{end_year}', fontsize=16, fontweight='bold')
@@ -154,24 +364,8 @@ elif page == "Visualisasi Berdasarkan Tahun":
         ax.grid(True)
         st.pyplot(fig)
 
-        # Fungsi untuk mengkategorikan gempa berdasarkan magnitudo
-        def kategori_gempa(magnitude):
-            if magnitude < 4.0:
-                return 'Minor'
-            elif 4.0 <= magnitude < 5.0:
-                return 'Ringan'
-            elif 5.0 <= magnitude < 6.0:
-                return 'Sedang'
-            elif 6.0 <= magnitude < 7.0:
-                return 'Kuat'
-            else:
-                return 'Besar'
-        
-        # Menambahkan kolom kategori ke DataFrame
-        data['Kategori'] = data['magnitude'].apply(kategori_gempa)
-        
-        # Menghitung jumlah gempa per kategori
-        kategori_counts = data['Kategori'].value_counts().reindex(['Minor', 'Ringan', 'Sedang', 'Kuat', 'Besar'], fill_value=0)
+        # Menghitung jumlah gempa per kategori magnitudo (rentang tanggal terpilih)
+        kategori_counts = analytics.magnitude_categories(filtered_data)
         
         # Visualisasi menggunakan bar chart
         fig, ax = plt.subplots(figsize=(10, 6))
@@ -185,17 +379,7 @@ elif page == "Visualisasi Berdasarkan Tahun":
 
         # Distribusi Titik Gempa Berdasarkan Wilayah
         st.subheader('📍 Distribusi Titik Gempa Berdasarkan Wilayah')
-        region_counts = {}
-        for island, provinces in regions_islands.items():
-            total_count = 0
-            for province in provinces:
-                bounds = regions_detailed[province]
-                count = filtered_data[(filtered_data['latitude'] >= bounds['lat_min']) & 
-                                      (filtered_data['latitude'] <= bounds['lat_max']) & 
-                                      (filtered_data['longitude'] >= bounds['lon_min']) & 
-                                      (filtered_data['longitude'] <= bounds['lon_max'])].shape[0]
-                total_count += count
-            region_counts[island] = total_count
+        region_counts = analytics.region_counts(filtered_data)
 
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.bar(region_counts.keys(), region_counts.values(), color=['#FF6347', '#1E90FF', '#32CD32', '#FFD700', '#8A2BE2'])
@@ -208,7 +392,7 @@ elif page == "Visualisasi Berdasarkan Tahun":
 
         # Tren Kedalaman Gempa per Tahun
         st.subheader('📉 Tren Kedalaman Gempa per Tahun')
-        avg_depth_per_year = filtered_data.groupby('Year')['depth'].mean()
+        avg_depth_per_year = analytics.yearly_mean(filtered_data, 'depth')
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.plot(avg_depth_per_year.index, avg_depth_per_year.values, marker='o', color='blue')
         ax.set_title('Tren Kedalaman Gempa per Tahun', fontsize=16, fontweight='bold')
@@ -227,11 +411,8 @@ elif page == "Visualisasi Berdasarkan Tahun":
         ax.grid(axis='y', linestyle='--', alpha=0.7)
         st.pyplot(fig)
 
-        # Kategorisasi kedalaman
-        data['Depth Category'] = pd.cut(data['depth'], bins=[0, 70, 300, float('inf')], labels=['Dangkal', 'Menengah', 'Dalam'])
-    
-        # Hitung frekuensi setiap kategori
-        depth_freq = data['Depth Category'].value_counts().sort_index()
+        # Kategorisasi kedalaman dan frekuensi setiap kategori (rentang tanggal terpilih)
+        depth_freq = analytics.depth_categories(filtered_data)
     
         # Visualisasi
         st.subheader("📊 Histogram Frekuensi Gempa Berdasarkan Kedalaman")
@@ -245,34 +426,36 @@ elif page == "Visualisasi Berdasarkan Tahun":
         
         # Heatmap
         st.subheader('🗺️ Heatmap Gempa')
-        m = folium.Map(location=[(filtered_data['latitude'].mean()), (filtered_data['longitude'].mean())], zoom_start=5)
-        heat_data = [[row['latitude'], row['longitude']] for _, row in filtered_data.iterrows() if not pd.isnull(row['latitude']) and not pd.isnull(row['longitude'])]
-        if heat_data:
-            HeatMap(heat_data, radius=15).add_to(m)
-            st_folium(m, width=700, height=500)
+        points = filtered_data[['latitude', 'longitude']].dropna()
+        if not points.empty:
+            seismicity_params = seismicity_controls(date_range)
+            maps.show_map(year_heatmap_html(dataset_version, points, start_year, end_year, date_range,
+                                            location_query, seismicity_params))
         else:
             st.warning("Tidak ada data untuk heatmap pada rentang tahun ini.")
 
 elif page == "Distribusi Berdasarkan Pulau":
     st.title('📊 **Distribusi Gempa Berdasarkan Pulau**')
 
-    selected_region = st.selectbox('Pilih Pulau:', list(regions_detailed.keys()))
-    bounds = regions_detailed[selected_region]
-    filtered_region_data = data[(data['latitude'] >= bounds['lat_min']) &
-                                (data['latitude'] <= bounds['lat_max']) &
-                                (data['longitude'] >= bounds['lon_min']) &
-                                (data['longitude'] <= bounds['lon_max'])]
+    selected_region = st.selectbox('Pilih Pulau:', analytics.island_names())
+    filtered_region_data = analytics.filter_data_by_region(data, selected_region)
+
+    min_year, max_year = analytics.year_bounds(data)
+    start_year, end_year = st.slider('Pilih Rentang Tahun:', min_value=min_year, max_value=max_year, value=DEFAULT_YEARS)
+    date_range = select_date_range(start_year, end_year, selected_region)
+    filtered_region_data = analytics.filter_data_by_date_range(
+        filter_data_by_year_range(filtered_region_data, start_year, end_year), *date_range)
 
-    min_year = int(data['datetime'].min()[:4])
-    max_year = int(data['datetime'].max()[:4])
-    start_year, end_year = st.slider('Pilih Rentang Tahun:', min_value=min_year, max_value=max_year, value=(2008, 2024))
-    filtered_region_data = filter_data_by_year_range(filtered_region_data, start_year, end_year)
+    st.subheader(f'📅 Statistik Gempa di Pulau {selected_region} ({date_range[0]} - {date_range[1]})')
+    show_date_range_statistics(*date_range, selected_region)
+
+    location_query, filtered_region_data = location_search(filtered_region_data, 'cari_pulau')
 
     if filtered_region_data.empty:
         st.warning(f"Tidak ada data gempa untuk wilayah {selected_region}.")
     else:
         st.subheader(f'📉 Rata-rata Magnitudo Gempa di Pulau {selected_region} ({start_year}-{end_year})')
-        avg_magnitude = filtered_region_data.groupby('Year')['magnitude'].mean()
+        avg_magnitude = analytics.yearly_mean(filtered_region_data, 'magnitude')
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.plot(avg_magnitude.index, avg_magnitude.values, marker='o', color='orange')
         ax.set_title(f'Rata-rata Magnitudo Gempa di Pulau {selected_region}', fontsize=16, fontweight='bold')
@@ -282,7 +465,7 @@ elif page == "Distribusi Berdasarkan Pulau":
         st.pyplot(fig)
 
         st.subheader(f'📊 Frekuensi Gempa per Tahun di Pulau {selected_region}')
-        freq_per_year = filtered_region_data.groupby('Year').size()
+        freq_per_year = analytics.yearly_counts(filtered_region_data)
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.bar(freq_per_year.index, freq_per_year.values, color='cyan')
         ax.set_title(f'Frekuensi Gempa per Tahun di Pulau {selected_region}', fontsize=16, fontweight='bold')
@@ -292,11 +475,11 @@ elif page == "Distribusi Berdasarkan Pulau":
         st.pyplot(fig)
 
         st.subheader(f'🗺️ Heatmap Gempa di Pulau {selected_region}')
-        m = folium.Map(location=[(bounds['lat_min'] + bounds['lat_max']) / 2, (bounds['lon_min'] + bounds['lon_max']) / 2], zoom_start=6)
-        heat_data = [[row['latitude'], row['longitude']] for _, row in filtered_region_data.iterrows() if not pd.isnull(row['latitude']) and not pd.isnull(row['longitude'])]
-        if heat_data:
-            HeatMap(heat_data, radius=15).add_to(m)
-            st_folium(m, width=700, height=500)
+        points = filtered_region_data[['latitude', 'longitude']].dropna()
+        if not points.empty:
+            seismicity_params = seismicity_controls(date_range, selected_region)
+            maps.show_map(island_heatmap_html(dataset_version, points, selected_region, start_year, end_year,
+                                              date_range, location_query, seismicity_params))
         else:
             st.warning("Tidak ada data untuk heatmap pada wilayah ini.")
 
@@ -312,20 +495,87 @@ elif page == "Korelasi dan Distribusi":
     st.pyplot(fig)
 
     st.subheader("🌍 Distribusi Waktu Gempa")
-    # Pastikan datetime valid dengan errors='coerce'
-    data['hour'] = pd.to_datetime(data['datetime'], errors='coerce').dt.hour
-
-    # Filter baris dengan datetime tidak valid
-    data = data.dropna(subset=['hour'])
+    # Jumlah kejadian per jam (datetime tidak valid sudah menjadi NaT saat load)
+    hour_counts = snapshot['per_jam']
 
     fig, ax = plt.subplots(figsize=(10, 6))
-    sns.histplot(data=data, x='hour', bins=24, kde=False, ax=ax, color='blue')
+    ax.bar(hour_counts.index, hour_counts.values, width=1.0, color='blue', edgecolor='white')
     ax.set_title('Distribusi Waktu Gempa', fontsize=16, fontweight='bold')
     ax.set_xlabel('Jam (24 Jam)', fontsize=14)
     ax.set_ylabel('Frekuensi', fontsize=14)
     st.pyplot(fig)
 
 
+elif page == "Sekuens Gempa Susulan":
+    st.title('📊 **Sekuens Gempa Susulan (Omori-Utsu)**')
+    st.write('Laju gempa susulan dimodelkan sebagai K / (t + c)^p dan diestimasi dengan maksimum likelihood. '
+             'Sekuens diambil dengan jendela ruang-waktu Gardner-Knopoff di sekitar setiap gempa utama.')
+
+    min_magnitude = st.slider('Magnitudo Minimum Gempa Utama:', min_value=5.0, max_value=8.0, value=6.0, step=0.1)
+    fits, sequences = load_aftershock_fits(dataset_version, data, min_magnitude)
+
+    if fits.empty:
+        st.warning(f"Tidak ada gempa utama dengan magnitudo ≥ {min_magnitude}.")
+    else:
+        st.subheader(f'📋 Parameter Omori-Utsu ({len(fits)} gempa utama)')
+        st.dataframe(fits[['datetime', 'location', 'magnitude', 'jumlah_susulan', 'K', 'c', 'p', 'durasi_hari', 'status']])
+
+        labels = [f"{row.datetime:%Y-%m-%d} M{row.magnitude:.1f} {row.location}" for row in fits.itertuples()]
+        selected = st.selectbox('Pilih Gempa Utama:', range(len(fits)), format_func=lambda i: labels[i])
+        fit = fits.iloc[selected]
+        t, window_days = sequences[selected]
+
+        if fit['status'] == aftershock.STATUS_TOO_FEW:
+            st.warning(f"Gempa susulan terlalu sedikit untuk diestimasi (minimal {aftershock.MIN_AFTERSHOCKS}).")
+        elif fit['status'] == aftershock.STATUS_FAILED:
+            st.warning("Fit gagal: optimasi tidak konvergen atau parameter berhenti di batas pencarian "
+                       "(sekuens tidak menunjukkan peluruhan Omori-Utsu).")
+        else:
+            st.subheader('📉 Laju Gempa Susulan vs Model Omori-Utsu')
+            bins = np.logspace(np.log10(max(t.min(), 1e-3)), np.log10(window_days), 25)
+            counts, edges = np.histogram(t, bins=bins)
+            centres = np.sqrt(edges[:-1] * edges[1:])
+            model_t = np.logspace(np.log10(edges[0]), np.log10(window_days), 200)
+            fig, ax = plt.subplots(figsize=(10, 6))
+            ax.loglog(centres[counts > 0], (counts / np.diff(edges))[counts > 0], 'o', color='#FF6347', label='Observasi')
+            ax.loglog(model_t, fit['K'] / (model_t + fit['c']) ** fit['p'], color='blue',
+                      label=f"K={fit['K']:.1f}, c={fit['c']:.3f}, p={fit['p']:.2f}")
+            ax.set_title('Laju Gempa Susulan per Hari', fontsize=16, fontweight='bold')
+            ax.set_xlabel('Hari setelah gempa utama', fontsize=14)
+            ax.set_ylabel('Jumlah gempa per hari', fontsize=14)
+            ax.legend()
+            ax.grid(True, which='both', linestyle='--', alpha=0.5)
+            st.pyplot(fig)
+            if np.isfinite(fit['durasi_hari']):
+                st.write(f"**Perkiraan durasi aktivitas di atas laju latar belakang:** {fit['durasi_hari']:.0f} hari")
+
+elif page == "Frekuensi Kata Lokasi":
+    st.title('📊 **Frekuensi Kata pada Lokasi Gempa**')
+    max_words = st.slider('Jumlah Kata:', min_value=10, max_value=200, value=DEFAULT_WORDS, step=10)
+    location_index = snapshot['lokasi']
+    top_tokens = location_index.top_tokens(max_words)
+
+    if top_tokens.empty:
+        st.warning("Kolom lokasi tidak berisi kata.")
+    else:
+        st.subheader('☁️ Word Cloud Lokasi Gempa')
+        if max_words == DEFAULT_WORDS:
+            st.image(snapshot['word_cloud'])
+        else:
+            st.image(load_location_wordcloud(dataset_version, location_index, max_words))
+
+        top_20 = top_tokens.head(20)
+        st.subheader(f'📊 {len(top_20)} Kata Paling Sering')
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.barh(top_20.index[::-1], top_20.values[::-1], color='#FF6347')
+        ax.set_title('Kata Paling Sering pada Lokasi Gempa', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Jumlah Kemunculan', fontsize=14)
+        ax.grid(axis='x', linestyle='--', alpha=0.7)
+        st.pyplot(fig)
+
+        st.dataframe(top_tokens.rename_axis('kata').reset_index(name='jumlah'))
+
+
 #elif page == "Clustering Lokasi":
     #st.title('📊 **Clustering Lokasi Gempa**')
 
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+import aftershock
+
+
+# Laju latar belakang gempa utama di awal katalog dihitung dari selang yang
+# benar-benar teramati, bukan seluruh jendela Gardner-Knopoff
+def test_background_window_truncated_at_catalog_start():
+    start = pd.Timestamp('2010-01-01')
+    before = [start + pd.Timedelta(days=day) for day in range(0, 10, 2)]
+    data = pd.DataFrame({
+        'datetime': before + [start + pd.Timedelta(days=10)],
+        'latitude': [-7.0] * 6,
+        'longitude': [110.0] * 6,
+        'magnitude': [3.0] * 5 + [6.0],
+    })
+    mainshocks, sequences, background = aftershock.extract_sequences(data, min_magnitude=6.0)
+    assert len(mainshocks) == 1
+    np.testing.assert_allclose(background, [5 / 10])
+
+
+# Gempa M>=6 di dalam jendela gempa yang lebih besar bukan gempa utama
+def test_smaller_event_inside_larger_window_is_not_a_mainshock():
+    start = pd.Timestamp('2010-01-01')
+    data = pd.DataFrame({
+        'datetime': [start, start + pd.Timedelta(days=5), start + pd.Timedelta(days=400)],
+        'latitude': [-7.0, -7.1, 5.0],
+        'longitude': [110.0, 110.1, 95.0],
+        'magnitude': [7.0, 6.2, 6.1],
+    })
+    mainshocks, _, _ = aftershock.extract_sequences(data, min_magnitude=6.0)
+    assert mainshocks['magnitude'].tolist() == [7.0, 6.1]
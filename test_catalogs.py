@@ -0,0 +1,40 @@
+import pandas as pd
+
+import catalogs
+import validation
+
+
+def _catalog(source, rows):
+    frame = pd.DataFrame(rows, columns=['datetime', 'latitude', 'longitude', 'depth', 'magnitude', 'location'])
+    frame['datetime'] = pd.to_datetime(frame['datetime'])
+    frame['source'] = source
+    return frame
+
+
+# Dua gempa BMKG yang berbeda (14 s, ~40 km) tidak boleh digabung lewat satu
+# kejadian USGS yang cocok dengan keduanya
+def test_merge_keeps_separate_events_matched_by_one_report():
+    bmkg = _catalog('BMKG', [
+        ('2018-08-05 11:46:38', -8.30, 116.45, 10.0, 6.9, 'Lombok A'),
+        ('2018-08-05 11:46:52', -8.55, 116.70, 12.0, 5.1, 'Lombok B'),
+    ])
+    usgs = _catalog('USGS', [('2018-08-05 11:46:37', -8.29, 116.44, 31.0, 6.9, 'Lombok USGS')])
+
+    # Keduanya lolos pengecekan duplikat BMKG sendiri
+    assert validation.validate_catalog(bmkg)[1]['duplikat_dihapus'] == 0
+
+    merged = catalogs.merge_catalogs([bmkg, usgs])
+    assert sorted(merged['location']) == ['Lombok A', 'Lombok B']
+    assert merged.set_index('location').loc['Lombok A', 'sumber'] == 'BMKG+USGS'
+    assert merged.set_index('location').loc['Lombok B', 'sumber'] == 'BMKG'
+
+
+# Dengan satu laporan per sumber, kejadian yang sama tetap digabung
+def test_merge_groups_matching_reports_across_sources():
+    bmkg = _catalog('BMKG', [('2020-01-01 00:00:00', -7.0, 110.0, 10.0, 5.0, 'Jawa Tengah')])
+    usgs = _catalog('USGS', [('2020-01-01 00:00:03', -7.1, 110.1, 15.0, 5.2, 'Java')])
+
+    merged = catalogs.merge_catalogs([bmkg, usgs])
+    assert len(merged) == 1
+    assert merged.loc[0, 'location'] == 'Jawa Tengah'
+    assert merged.loc[0, 'jumlah_sumber'] == 2
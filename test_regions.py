@@ -0,0 +1,23 @@
+import analytics
+import regions
+
+
+# Tanpa GeoJSON, persegi terkecil menang di wilayah yang tumpang tindih
+def test_bounds_grid_prefers_smallest_rectangle():
+    grid = regions.grid_from_bounds(analytics.regions_detailed)
+    places = {
+        'Bali dan Nusa Tenggara': (-8.65, 115.22),  # Denpasar (juga di persegi Jawa)
+        'Maluku': (-5.6, 132.7),  # Kepulauan Kei (juga di persegi Papua)
+        'Jawa': (-6.2, 106.8),  # Jakarta (juga di persegi Sumatera)
+        'Papua': (-2.5, 140.7),  # Jayapura
+    }
+    labels = grid.assign([lat for lat, _ in places.values()], [lon for _, lon in places.values()])
+    assert [grid.names[label] for label in labels] == list(places)
+
+
+# Titik tepat di tepi persegi tetap masuk wilayah (batas inklusif)
+def test_bounds_grid_edges_are_inclusive():
+    grid = regions.grid_from_bounds(analytics.regions_detailed)
+    bounds = analytics.regions_detailed['Papua']
+    labels = grid.assign([bounds['lat_max'], bounds['lat_min']], [bounds['lon_max'], bounds['lon_max']])
+    assert [grid.names[label] for label in labels] == ['Papua', 'Papua']
@@ -0,0 +1,74 @@
+import heapq
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+# Jumlah kejadian terkuat yang disimpan per bucket (pulau, tahun)
+TOPK_PER_BUCKET = 10
+
+EVENT_COLUMNS = ['datetime', 'location', 'latitude', 'longitude', 'depth', 'magnitude', 'Year', 'pulau']
+
+
+# Indeks k gempa terkuat per (pulau, tahun), dibangun sekali saat load.
+#
+# Setiap bucket menyimpan posisi kejadian terurut dari magnitudo terbesar.
+# Query untuk kombinasi filter apa pun cukup menggabungkan (heap merge)
+# bucket yang cocok tanpa memindai seluruh katalog. Urutan hasil sama dengan
+# data.nlargest(n, 'magnitude'): magnitudo turun, lalu urutan baris asli.
+class TopKIndex:
+    def __init__(self, data, k=TOPK_PER_BUCKET):
+        self.k = k
+        magnitude = data['magnitude'].to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(magnitude))
+        order = valid[np.lexsort((valid, -magnitude[valid]))]
+
+        if 'pulau' in data.columns:
+            self.region_names = list(data['pulau'].cat.categories)
+            region = data['pulau'].cat.codes.to_numpy()
+        else:
+            self.region_names = []
+            region = np.full(len(data), -1)
+        year = data['Year'].fillna(-1).to_numpy(dtype=np.int64)
+
+        ranked = pd.DataFrame({'region': region[order], 'year': year[order], 'row': order})
+        top = ranked.groupby(['region', 'year'], sort=False).head(k)
+
+        # Simpan hanya baris kandidat (paling banyak k per bucket)
+        columns = [column for column in EVENT_COLUMNS if column in data.columns]
+        self.events = data.iloc[top['row'].to_numpy()][columns].reset_index(drop=True)
+        self.magnitude = self.events['magnitude'].to_numpy(dtype=float)
+        self.row = top['row'].to_numpy()
+
+        # Isi bucket sudah terurut dengan kunci (-magnitudo, baris asli, posisi)
+        self.buckets = {}
+        groups = top.reset_index(drop=True).groupby(['region', 'year'], sort=False).indices
+        for (bucket_region, bucket_year), positions in groups.items():
+            self.buckets[(int(bucket_region), int(bucket_year))] = [
+                (-self.magnitude[p], int(self.row[p]), int(p)) for p in positions
+            ]
+
+    # n gempa terkuat untuk pulau (list/None = semua) dan rentang tahun (inklusif)
+    def query(self, n=10, regions=None, start_year=None, end_year=None):
+        if n < 1:
+            raise ValueError("n harus minimal 1")
+        if n > self.k:
+            raise ValueError(f"Indeks hanya menyimpan {self.k} kejadian per bucket")
+        codes = None
+        if regions is not None:
+            codes = {self.region_names.index(name) for name in regions if name in self.region_names}
+
+        selected = []
+        for (region, year), ranked in self.buckets.items():
+            if codes is not None and region not in codes:
+                continue
+            if (start_year is not None or end_year is not None) and year < 0:
+                continue
+            if start_year is not None and year < start_year:
+                continue
+            if end_year is not None and year > end_year:
+                continue
+            selected.append(ranked)
+
+        best = [p for _, _, p in islice(heapq.merge(*selected), n)]
+        return self.events.iloc[best].reset_index(drop=True)
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+# Kolom wajib dan rentang nilai yang valid
+REQUIRED_COLUMNS = ['datetime', 'latitude', 'longitude', 'depth', 'magnitude']
+VALID_RANGES = {
+    'latitude': (-90.0, 90.0),
+    'longitude': (-180.0, 180.0),
+    'depth': (-10.0, 800.0),
+    'magnitude': (-2.0, 10.0),
+}
+
+# Dua laporan dianggap kejadian yang sama jika selisih waktu dan jaraknya kecil
+DUPLICATE_SECONDS = 10.0
+DUPLICATE_KM = 50.0
+
+EARTH_RADIUS_KM = 6371.0
+
+
+# Jarak haversine (km) antar pasangan titik, vektor
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# Pasangan kejadian (i, j) yang berdekatan dalam waktu dan jarak.
+#
+# Data diurutkan menurut waktu lalu setiap kejadian dibandingkan dengan
+# tetangga ke-1, ke-2, ... secara vektor. Perulangan berhenti begitu tidak ada
+# lagi pasangan dalam jendela waktu, sehingga biayanya O(n log n + n * k) dengan
+# k = jumlah kejadian maksimum dalam satu jendela waktu.
+def match_events(times, lat, lon, max_seconds=DUPLICATE_SECONDS, max_km=DUPLICATE_KM):
+    times = np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+    order = np.argsort(times, kind='stable')
+    t = times[order]
+    la = np.asarray(lat, dtype=float)[order]
+    lo = np.asarray(lon, dtype=float)[order]
+    window = int(max_seconds * 1e9)
+
+    left, right = [], []
+    candidates = np.arange(len(t))
+    lag = 1
+    while candidates.size:
+        candidates = candidates[candidates + lag < len(t)]
+        close = t[candidates + lag] - t[candidates] <= window
+        candidates = candidates[close]
+        if candidates.size:
+            near = haversine_km(la[candidates], lo[candidates], la[candidates + lag], lo[candidates + lag]) <= max_km
+            left.append(candidates[near])
+            right.append(candidates[near] + lag)
+        lag += 1
+
+    if not left:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return order[np.concatenate(left)], order[np.concatenate(right)]
+
+
+# Label grup untuk setiap kejadian dari daftar pasangan, berbasis anchor.
+#
+# Kejadian diproses urut waktu: kejadian bergabung ke grup anchor paling awal
+# yang berpasangan dengannya, dan menjadi anchor baru jika tidak ada. Label
+# grup adalah posisi anchor-nya. Setiap anggota grup cocok langsung dengan
+# anchor, sehingga rantai a~b~c tidak menggabungkan a dan c yang berjauhan.
+def group_labels(times, left, right):
+    times = np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+    position = np.empty(len(times), dtype=np.int64)
+    position[np.argsort(times, kind='stable')] = np.arange(len(times))
+    # Anggota pertama setiap pasangan adalah yang lebih awal
+    swap = position[left] > position[right]
+    left, right = np.where(swap, right, left), np.where(swap, left, right)
+
+    labels = np.arange(len(times))
+    # Pasangan urut (kejadian kemudian, calon anchor); semua pasangan dengan
+    # kejadian i di sisi kanan sudah diproses sebelum i menjadi calon anchor
+    for k in np.lexsort((position[left], position[right])):
+        anchor, event = left[k], right[k]
+        if labels[event] == event and labels[anchor] == anchor:
+            labels[event] = anchor
+    return labels
+
+
+# Urutan prioritas laporan dalam grup: magnitudo terbesar, lalu waktu paling
+# awal, lalu urutan baris (deterministik)
+def report_priority(labels, magnitude, times):
+    return np.lexsort((np.arange(len(labels)), np.asarray(times, dtype='datetime64[ns]'),
+                       -np.asarray(magnitude, dtype=float), labels))
+
+
+# Validasi katalog: kolom wajib, waktu yang bisa di-parse, rentang nilai,
+# lalu hapus laporan ganda dari kejadian yang sama (dipertahankan satu laporan
+# menurut report_priority). Mengembalikan data bersih dan laporan kualitas.
+def validate_catalog(data, max_seconds=DUPLICATE_SECONDS, max_km=DUPLICATE_KM):
+    report = {'total_baris': int(len(data)), 'kolom_hilang': [], 'nilai_kosong': {},
+              'waktu_tidak_valid': 0, 'di_luar_rentang': {}}
+
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in data.columns]
+    if missing_columns:
+        report['kolom_hilang'] = missing_columns
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing_columns)}")
+
+    valid = np.ones(len(data), dtype=bool)
+    for column in REQUIRED_COLUMNS:
+        empty = data[column].isna().to_numpy()
+        report['nilai_kosong'][column] = int(empty.sum())
+        valid &= ~empty
+
+    # Waktu dengan zona (mis. '...Z') dikonversi ke UTC tanpa zona
+    if not pd.api.types.is_datetime64_any_dtype(data['datetime']):
+        parsed = pd.to_datetime(data['datetime'], errors='coerce', format='mixed', utc=True)
+        unparseable = (parsed.isna() & data['datetime'].notna()).to_numpy()
+        report['waktu_tidak_valid'] = int(unparseable.sum())
+        valid &= ~unparseable
+        data = data.assign(datetime=parsed.dt.tz_localize(None))
+    elif getattr(data['datetime'].dt, 'tz', None) is not None:
+        data = data.assign(datetime=data['datetime'].dt.tz_convert('UTC').dt.tz_localize(None))
+
+    for column, (low, high) in VALID_RANGES.items():
+        values = pd.to_numeric(data[column], errors='coerce').to_numpy(dtype=float)
+        out_of_range = ~np.isnan(values) & ((values < low) | (values > high))
+        out_of_range |= np.isnan(values) & data[column].notna().to_numpy()
+        report['di_luar_rentang'][column] = int(out_of_range.sum())
+        valid &= ~out_of_range
+
+    clean = data[valid]
+    for column in VALID_RANGES:
+        clean = clean.assign(**{column: pd.to_numeric(clean[column])})
+
+    left, right = match_events(clean['datetime'].to_numpy(), clean['latitude'].to_numpy(),
+                               clean['longitude'].to_numpy(), max_seconds, max_km)
+    labels = group_labels(clean['datetime'].to_numpy(), left, right)
+    # Pertahankan satu laporan per grup: yang prioritasnya tertinggi
+    order = report_priority(labels, clean['magnitude'].to_numpy(), clean['datetime'].to_numpy())
+    keep = np.zeros(len(clean), dtype=bool)
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = labels[order][1:] != labels[order][:-1]
+    keep[order[first]] = True
+
+    report['baris_tidak_valid'] = int((~valid).sum())
+    report['duplikat_dihapus'] = int((~keep).sum())
+    report['baris_bersih'] = int(keep.sum())
+    return clean[keep].reset_index(drop=True), report